@@ -0,0 +1,256 @@
+"""Parquet archive of an upload's entries, and vectorized search over it.
+
+An archived upload's rows leave log_entries for one zstd-compressed Parquet
+file, written in (timestamp, id) order so that keyset pages are slices taken
+from the end of the filtered rows. Level and source are dictionary-encoded on
+disk and in memory. Filters, including the /logs/search query language, run
+as Arrow compute expressions, and row-group statistics on the sorted
+timestamp column let time-bounded scans skip most of the file. Analytics keep
+reading the rollup and template tables, which archiving leaves in place.
+
+pyarrow is optional; without it uploads simply stay in the database.
+"""
+from typing import NamedTuple
+import json
+import os
+import re
+
+from backend import search
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+COLUMNS = ('id', 'timestamp', 'log_level', 'source', 'message', 'template_id', 'http_status', 'client_ip',
+           'additional_fields')
+DICTIONARY_COLUMNS = ['log_level', 'source', 'client_ip']
+# Characters that separate words, matching search.WORD_PATTERN and the database text indexes.
+_SEPARATOR = r'[^\pL\pN]'
+
+
+class ArchivedEntry(NamedTuple):
+    id: int
+    timestamp: object
+    log_level: str
+    source: str
+    message: str
+    template_id: int | None
+    http_status: int | None
+    client_ip: str | None
+    additional_fields: dict
+
+
+class ArchivePage(NamedTuple):
+    entries: list
+    total: int
+    has_more: bool
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _require():
+    if pa is None:
+        raise RuntimeError("Archiving uploads requires the pyarrow package")
+
+
+def _schema(dictionaries: bool = False):
+    """Schema of the files, or with dictionaries=True, of the tables read back from them"""
+    def text(name):
+        return (name, pa.dictionary(pa.int32(), pa.string()) if dictionaries and name in DICTIONARY_COLUMNS else pa.string())
+    return pa.schema([
+        ('id', pa.int64()),
+        ('timestamp', pa.timestamp('us', tz='UTC')),
+        text('log_level'),
+        text('source'),
+        ('message', pa.string()),
+        ('template_id', pa.int32()),
+        ('http_status', pa.int16()),
+        text('client_ip'),
+        ('additional_fields', pa.string()),  # JSON text
+    ])
+
+
+def write_archive(path: str, row_groups) -> int:
+    """Write lists of tuples ordered like COLUMNS, one row group each, and return the row count.
+
+    Rows must arrive in (timestamp, id) order with null timestamps last. The
+    file is written under a temporary name and renamed into place when complete.
+    """
+    _require()
+    schema = _schema()
+    temporary = path + '.tmp'
+    written = 0
+    try:
+        with pq.ParquetWriter(temporary, schema, compression='zstd', use_dictionary=DICTIONARY_COLUMNS) as writer:
+            for rows in row_groups:
+                if not rows:
+                    continue
+                columns = [list(column) for column in zip(*rows)]
+                columns[-1] = [json.dumps(fields) if fields is not None else None for fields in columns[-1]]
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+                ), row_group_size=len(rows))
+                written += len(rows)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return written
+
+
+def _word_pattern(words: tuple, prefix: bool) -> str:
+    pattern = f'(?:^|{_SEPARATOR})' + f'{_SEPARATOR}+'.join(words)
+    return pattern if prefix else pattern + f'(?:$|{_SEPARATOR})'
+
+
+def text_expression(node, message):
+    """Arrow filter expression for a parsed search query, matching whole words like the text indexes"""
+    if isinstance(node, search.Term):
+        return pc.match_substring_regex(message, pattern=_word_pattern(node.words, node.prefix), ignore_case=True)
+    if isinstance(node, search.Phrase):
+        return pc.match_substring_regex(message, pattern=_word_pattern(node.words, False), ignore_case=True)
+    if isinstance(node, search.And):
+        expression = text_expression(node.children[0], message)
+        for child in node.children[1:]:
+            expression = expression & text_expression(child, message)
+        return expression
+    if isinstance(node, search.Or):
+        expression = text_expression(node.children[0], message)
+        for child in node.children[1:]:
+            expression = expression | text_expression(child, message)
+        return expression
+    if isinstance(node, search.Not):
+        return ~text_expression(node.child, message)
+    raise TypeError(f"Unknown query node {node!r}")
+
+
+def field_expression(key: str, values: tuple):
+    """Match entries whose additional_fields holds `key` with one of `values`.
+
+    additional_fields is stored as json.dumps text, so this looks for the
+    encoded pair between the delimiters json.dumps writes around it. A nested
+    object with the same pair also matches.
+    """
+    encoded_key = re.escape(json.dumps(key))
+    alternatives = '|'.join(re.escape(json.dumps(value)) for value in values)
+    pattern = f'[{{ ]{encoded_key}: (?:{alternatives})[,}}]'
+    return pc.match_substring_regex(ds.field('additional_fields'), pattern=pattern)
+
+
+def filter_expression(q: str = None, log_level: str = None, start_time=None, end_time=None, source: str = None,
+                      http_status: int = None, status_range: tuple = None, client_ip: str = None, fields: tuple = ()):
+    """Arrow expression for the /logs/search filters, or None when there are none"""
+    _require()
+    conditions = []
+    node = search.parse_query(q) if q else None
+    if node is not None:
+        conditions.append(text_expression(node, pc.coalesce(ds.field('message'), pa.scalar(''))))
+    if log_level:
+        conditions.append(ds.field('log_level') == log_level.upper())
+    if source:
+        conditions.append(ds.field('source') == source)
+    timestamp_type = pa.timestamp('us', tz='UTC')
+    if start_time:
+        conditions.append(ds.field('timestamp') >= pa.scalar(start_time, timestamp_type))
+    if end_time:
+        conditions.append(ds.field('timestamp') <= pa.scalar(end_time, timestamp_type))
+    if http_status is not None:
+        conditions.append(ds.field('http_status') == http_status)
+    if status_range:
+        conditions.append((ds.field('http_status') >= status_range[0]) & (ds.field('http_status') <= status_range[1]))
+    if client_ip:
+        conditions.append(ds.field('client_ip') == client_ip)
+    for key, values in fields:
+        conditions.append(field_expression(key, values))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def _dataset(path: str):
+    # The explicit schema reads columns added since a file was written as nulls.
+    return ds.dataset(path, schema=_schema(dictionaries=True),
+                      format=ds.ParquetFileFormat(read_options={'dictionary_columns': DICTIONARY_COLUMNS}))
+
+
+def _entries(table) -> list:
+    return [
+        ArchivedEntry(**{**row, 'additional_fields': json.loads(row['additional_fields']) if row['additional_fields'] else {}})
+        for row in table.to_pylist()
+    ]
+
+
+def search_page(path: str, expression, offset: int, limit: int, before: tuple = None) -> ArchivePage:
+    """One page of matching entries in (timestamp, id) descending order, with the total match count.
+
+    `before` is a (timestamp, id) keyset position, used instead of offset.
+    Only the key columns (and message, when filtering on it) are scanned for
+    every row; the full rows are read back for the page alone.
+    """
+    _require()
+    dataset = _dataset(path)
+    keys = dataset.to_table(columns=['id', 'timestamp'], filter=expression)
+    total = keys.num_rows
+    if before is not None:
+        # Keys are in ascending order with null timestamps last, so those before the position are a prefix.
+        timestamps, timestamp = keys.column('timestamp'), pa.scalar(before[0], pa.timestamp('us', tz='UTC'))
+        earlier = pc.or_kleene(pc.less(timestamps, timestamp),
+                               pc.and_kleene(pc.equal(timestamps, timestamp), pc.less(keys.column('id'), before[1])))
+        stop = pc.sum(pc.fill_null(earlier, False)).as_py() or 0
+    else:
+        stop = max(total - offset, 0)
+    start = max(stop - limit, 0)
+    page_keys = keys.slice(start, stop - start)
+    if not page_keys.num_rows:
+        return ArchivePage([], total, False)
+    ids = page_keys.column('id')
+    timestamps = pc.drop_null(page_keys.column('timestamp'))
+    # The page's time bounds let row-group statistics skip the rest of the file.
+    page_filter = pc.is_in(ds.field('id'), value_set=ids.combine_chunks())
+    if len(timestamps) == page_keys.num_rows:
+        page_filter = page_filter & (ds.field('timestamp') >= pc.min(timestamps)) & (ds.field('timestamp') <= pc.max(timestamps))
+    rows = dataset.to_table(columns=list(COLUMNS), filter=page_filter)
+    return ArchivePage(_entries(rows)[::-1], total, start > 0)
+
+
+def iter_entries(path: str, expression, descending: bool = True):
+    """Yield every matching entry one row group at a time, in (timestamp, id) order"""
+    _require()
+    dataset = _dataset(path)
+    groups = [group for fragment in dataset.get_fragments() for group in fragment.split_by_row_group()]
+    for group in reversed(groups) if descending else groups:
+        rows = group.to_table(schema=dataset.schema, columns=list(COLUMNS), filter=expression)
+        entries = _entries(rows)
+        yield from reversed(entries) if descending else entries
+
+
+def distribution(path: str, field: str, expression, limit: int = None) -> list:
+    """(value, count) pairs for one column over the matching entries, most frequent first.
+
+    field is a column name or 'status_class', the hundreds digit of
+    http_status. Entries without an HTTP status or client IP are left out of
+    those groupings.
+    """
+    _require()
+    column = 'http_status' if field == 'status_class' else field
+    values = _dataset(path).to_table(columns=[column], filter=expression).column(column)
+    if pa.types.is_dictionary(values.type):
+        values = values.cast(values.type.value_type)
+    if field == 'status_class':
+        values = pc.divide(values, 100)
+    if field in ('http_status', 'status_class', 'client_ip'):
+        values = pc.drop_null(values)
+    counts = pc.value_counts(values)
+    order = pc.sort_indices(counts, sort_keys=[('counts', 'descending'), ('values', 'ascending')])
+    pairs = [(item['values'], item['counts']) for item in counts.take(order).to_pylist()]
+    return pairs[:limit] if limit else pairs
@@ -0,0 +1,123 @@
+"""Deterministic synthetic log files in the formats backend.parser understands.
+
+    python -m backend.benchmarks.generate out.log --lines 1000000 --mix python=2,apache=1,json=1
+
+The same arguments always produce the same bytes, so benchmark runs are
+comparable. `templates` bounds the number of distinct message shapes and
+`cardinality` the number of distinct users, hosts, paths and IPs.
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import random
+
+FORMATS = ('python', 'apache', 'json')
+LEVELS = (('INFO', 70), ('WARNING', 15), ('ERROR', 10), ('DEBUG', 5))
+STATUSES = ((200, 85), (304, 5), (404, 6), (500, 4))
+METHODS = ('GET', 'GET', 'GET', 'POST', 'PUT', 'DELETE')
+MESSAGE_SHAPES = (
+    'request {n} failed for user {user}',
+    'connection to {host} timed out after {ms} ms',
+    'cache miss for key {key}',
+    'user {user} logged in from {ip}',
+    'job {n} finished in {ms} ms',
+    'retrying call to {host} attempt {attempt}',
+    'payment {n} declined for user {user}',
+    'disk usage on {host} at {percent} percent',
+)
+START_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_mix(text: str) -> dict:
+    """Parse 'python=2,apache=1' into format weights"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in FORMATS:
+            raise ValueError(f"Unknown format {name!r}; expected one of {FORMATS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LogGenerator:
+    def __init__(self, mix: dict = None, seed: int = 0, templates: int = 64, cardinality: int = 1000,
+                 span: timedelta = timedelta(days=7)):
+        self.mix = mix or {name: 1.0 for name in FORMATS}
+        self.random = random.Random(seed)
+        self.shapes = [
+            MESSAGE_SHAPES[index % len(MESSAGE_SHAPES)] + (f' in module m{index // len(MESSAGE_SHAPES)}' if index >= len(MESSAGE_SHAPES) else '')
+            for index in range(max(templates, 1))
+        ]
+        self.cardinality = max(cardinality, 1)
+        self.span = span
+
+    def _weighted(self, choices):
+        values, weights = zip(*choices)
+        return self.random.choices(values, weights)[0]
+
+    def _message(self, n: int) -> str:
+        pick = self.random.randrange
+        return self.random.choice(self.shapes).format(
+            n=n, user=f'u{pick(self.cardinality)}', host=f'host-{pick(self.cardinality)}.internal',
+            key=f'k{pick(self.cardinality)}', ip=self._ip(), ms=pick(1, 30000), attempt=pick(1, 6), percent=pick(50, 100),
+        )
+
+    def _ip(self) -> str:
+        value = self.random.randrange(self.cardinality)
+        return f'10.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}'
+
+    def _python(self, n: int, when: datetime) -> str:
+        stamp = when.strftime('%Y-%m-%d %H:%M:%S') + f',{when.microsecond // 1000:03d}'
+        return f'{stamp} - {self._weighted(LEVELS)} - {self._message(n)}'
+
+    def _apache(self, n: int, when: datetime) -> str:
+        path = f'/api/v1/items/{self.random.randrange(self.cardinality)}'
+        size = self.random.randrange(100, 50000)
+        stamp = when.strftime('%d/%b/%Y:%H:%M:%S +0000')
+        return (f'{self._ip()} - - [{stamp}] "{self.random.choice(METHODS)} {path} HTTP/1.1" '
+                f'{self._weighted(STATUSES)} {size} "-" "bench/1.0"')
+
+    def _json(self, n: int, when: datetime) -> str:
+        return json.dumps({
+            'timestamp': when.isoformat(),
+            'level': self._weighted(LEVELS),
+            'source': f'svc-{self.random.randrange(min(self.cardinality, 16))}',
+            'message': self._message(n),
+            'request_id': n,
+        })
+
+    def lines(self, count: int):
+        """Yield `count` lines with evenly spaced, increasing timestamps"""
+        step = self.span / max(count, 1)
+        formats, weights = zip(*self.mix.items())
+        render = {'python': self._python, 'apache': self._apache, 'json': self._json}
+        for n in range(count):
+            yield render[self.random.choices(formats, weights)[0]](n, START_TIME + step * n)
+
+
+def write_log_file(path: str, count: int, **options) -> int:
+    """Write `count` generated lines to path and return the number of bytes written"""
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in LogGenerator(**options).lines(count):
+            written += f.write(line + '\n')
+    return written
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    arguments.add_argument('path')
+    arguments.add_argument('--lines', type=int, default=100000)
+    arguments.add_argument('--mix', type=parse_mix, default='python=1,apache=1,json=1')
+    arguments.add_argument('--seed', type=int, default=0)
+    arguments.add_argument('--templates', type=int, default=64)
+    arguments.add_argument('--cardinality', type=int, default=1000)
+    args = arguments.parse_args(argv)
+    written = write_log_file(args.path, args.lines, mix=args.mix, seed=args.seed,
+                             templates=args.templates, cardinality=args.cardinality)
+    print(f'Wrote {args.lines} lines ({written} bytes) to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""In-process caches for serialized API responses and other per-request lookups.
+
+Entries are bounded in number (least recently used go first) and in age.
+Response entries also remember the upload they were computed from, so that
+ingestion can drop exactly the entries an upload change affects. Each drop
+bumps the upload's generation; a response computed while that happened is
+not stored.
+"""
+from collections import OrderedDict
+from typing import NamedTuple
+import hashlib
+import threading
+import time
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    upload_id: int | None
+    expires_at: float
+
+
+class ResponseCache:
+    """Size-bounded LRU of response bodies with TTL expiry, safe to share between threads"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._generations = {}  # upload id -> invalidations so far; None counts every invalidation
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(user_id: int, upload_id: int | None, endpoint: str, params: dict) -> tuple:
+        """Key for one response; params are sorted and rendered so equivalent requests match"""
+        normalized = tuple(sorted((name, repr(value)) for name, value in params.items()))
+        return (user_id, upload_id, endpoint, normalized)
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def generation(self, upload_id: int | None) -> int:
+        """Token to read before computing a response for this upload and hand to put()"""
+        with self._lock:
+            return self._generations.get(upload_id, 0)
+
+    def put(self, key: tuple, body: bytes, generation: int | None = None) -> CachedResponse:
+        """Store a response and return its entry; with a generation from before the upload was
+        last invalidated, the entry is returned without being stored"""
+        entry = CachedResponse(body, body_etag(body), key[1], time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            if generation is not None and self._generations.get(key[1], 0) != generation:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate_upload(self, upload_id: int):
+        """Drop entries computed from this upload, and those spanning every upload"""
+        with self._lock:
+            self._generations[upload_id] = self._generations.get(upload_id, 0) + 1
+            self._generations[None] = self._generations.get(None, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry.upload_id in (upload_id, None)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def uncached_response(body: bytes) -> CachedResponse:
+    """Entry for a response that is served once and not stored"""
+    return CachedResponse(body, body_etag(body), None, time.monotonic())
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header value covers this ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class TTLCache:
+    """Small thread-safe mapping whose entries expire after a fixed time, evicting the least recently used"""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
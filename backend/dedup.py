@@ -0,0 +1,115 @@
+"""Recognising lines of a new upload that an earlier upload already stored.
+
+Files are cut into content-defined chunks of whole lines: a chunk ends after
+a line whose CRC-32 has its low CHUNK_BITS bits clear, or after
+MAX_CHUNK_LINES lines. Boundaries depend only on the lines themselves, so a
+log that grew or was rotated keeps the chunks of the content it shares with
+an earlier copy. A chunk is identified by a BLAKE2b digest of its lines,
+each ended by \\n whichever line endings the file used.
+
+ChunkScanner looks up the first chunk of a file among the first chunks of
+earlier uploads and follows that upload's chunk list for as long as the new
+file repeats it. The earlier file's last chunk usually ended at its end of
+file rather than at a boundary, so it is compared with the start of the new
+chunk instead. Only a new file that starts with the whole of an earlier one
+overlaps it, so the lines it skips are exactly the entries that upload shows.
+"""
+from typing import NamedTuple
+import hashlib
+import zlib
+
+CHUNK_BITS = 10  # about 1024 lines per chunk
+MAX_CHUNK_LINES = 8 << CHUNK_BITS
+_BOUNDARY_MASK = (1 << CHUNK_BITS) - 1
+
+
+class Chunk(NamedTuple):
+    digest: str
+    lines: int
+    bytes: int
+
+
+class Overlap(NamedTuple):
+    upload_id: int  # the earlier upload whose whole file the new one starts with
+    lines: int  # that file's lines, which the new one need not ingest again
+    bytes: int
+    identical: bool  # the new file has no lines besides
+
+
+def _digest(lines: list) -> str:
+    """Digest of raw lines with their line endings normalised to \\n"""
+    data = b''.join(lines).replace(b'\r\n', b'\n')
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ChunkScanner:
+    """Chunk a file's lines in order and find the earlier upload whose whole file it starts with.
+
+    `lookup(digest)` returns (upload_id, chunks) for an earlier upload whose
+    file's first chunk has that digest, with all of that file's chunks, or
+    None when there is no such upload.
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.chunks = []
+        self.lines = 0
+        self._state = 'searching'  # then 'following' an earlier upload's chunks, and 'done'
+        self._followed_id = None
+        self._followed = []
+        self._position = 0
+        self._skipped_lines = 0
+        self._skipped_bytes = 0
+        self._pending = []
+
+    def feed(self, lines):
+        """Consume raw lines (bytes, with their line endings) in file order"""
+        crc32, pending = zlib.crc32, self._pending
+        for line in lines:
+            pending.append(line)
+            if crc32(line.rstrip(b'\r\n')) & _BOUNDARY_MASK == 0 or len(pending) >= MAX_CHUNK_LINES:
+                self._end_chunk()
+        self.lines += len(lines)
+
+    def finish(self) -> Overlap | None:
+        """Close the last chunk and return the overlap found, if any"""
+        if self._pending:
+            self._end_chunk()
+        if self._followed_id is None or self._position < len(self._followed):
+            return None
+        return Overlap(self._followed_id, self._skipped_lines, self._skipped_bytes, self._skipped_lines == self.lines)
+
+    def _end_chunk(self):
+        pending = self._pending
+        chunk = Chunk(_digest(pending), len(pending), sum(map(len, pending)))
+        if self._state == 'searching':
+            found = self.lookup(chunk.digest)
+            if found is None:
+                self._state = 'done'
+            else:
+                self._followed_id, self._followed = found
+                self._state = 'following'
+        if self._state == 'following':
+            self._follow(chunk)
+        self.chunks.append(chunk)
+        pending.clear()
+
+    def _follow(self, chunk: Chunk):
+        """Skip the chunk, or the part of it the followed file ends with"""
+        followed = self._followed[self._position]
+        if followed.digest == chunk.digest:
+            lines, size = chunk.lines, chunk.bytes
+        elif self._position == len(self._followed) - 1 and chunk.lines > followed.lines and \
+                _digest(self._pending[:followed.lines]) == followed.digest:
+            # The followed file's last chunk ended at its end of file, and this file carries on from there.
+            lines, size = followed.lines, sum(map(len, self._pending[:followed.lines]))
+        else:
+            self._state = 'done'
+            return
+        self._position += 1
+        self._skipped_lines += lines
+        self._skipped_bytes += size
+        if self._position == len(self._followed):
+            self._state = 'done'
@@ -0,0 +1,65 @@
+"""In-process fan-out of newly ingested entries to Server-Sent Events subscribers.
+
+Ingestion runs on worker threads while SSE responses are async generators on
+the event loop, so publish() hands entries over with call_soon_threadsafe.
+Each subscriber has a bounded queue; one that falls behind is marked lagged
+and told so, instead of holding ingestion back or growing without limit.
+"""
+import asyncio
+import json
+import threading
+
+
+class Subscription:
+    def __init__(self, upload_id: int, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.upload_id = upload_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.lagged = False
+
+    def _offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.lagged = True
+
+
+class LiveBroker:
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, upload_id: int) -> Subscription:
+        """Register a subscriber for an upload; call from the event loop"""
+        subscription = Subscription(upload_id, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscriptions.setdefault(upload_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.upload_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.upload_id]
+
+    def has_subscribers(self, upload_id: int) -> bool:
+        return upload_id in self._subscriptions
+
+    def publish(self, upload_id: int, event: str, data):
+        """Queue one event for every subscriber of the upload; safe to call from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(upload_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, (event, data))
+            except RuntimeError:
+                # The subscriber's event loop has closed; it is cleaned up when its response ends.
+                pass
+
+
+def format_event(event: str, data) -> str:
+    """Encode one Server-Sent Event; data is serialized as a single JSON line"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,278 @@
+from sqlalchemy import BigInteger, DateTime, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import MetaData
+from backend import parser, search
+
+
+def add_missing_columns(engine: Engine, metadata: MetaData):
+    """Add columns that exist on the models but not yet in the database.
+
+    `create_all` only creates missing tables, so columns added to an existing
+    model would otherwise never reach databases created by an older version.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+
+
+def widen_upload_size(engine: Engine, metadata: MetaData):
+    """Store upload sizes as BIGINT so files over 2 GB fit"""
+    if engine.dialect.name != 'postgresql':
+        return
+    columns = {column['name']: column for column in inspect(engine).get_columns('log_file')}
+    if isinstance(columns['size']['type'], BigInteger):
+        return
+    with engine.begin() as conn:
+        conn.execute(text('ALTER TABLE log_file ALTER COLUMN size TYPE BIGINT'))
+
+
+def convert_entry_timestamps(engine: Engine, metadata: MetaData):
+    """Turn log_entries.timestamp from 'YYYY-MM-DD HH:MM:SS' text into timestamptz.
+
+    Rows written before this change hold the upload time rather than the event
+    time; the original lines are gone, so that value is what gets backfilled.
+    The ALTER rewrites the table once, under an exclusive lock.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+    columns = {column['name']: column for column in inspect(engine).get_columns('log_entries')}
+    if isinstance(columns['timestamp']['type'], DateTime):
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE log_entries ALTER COLUMN timestamp TYPE TIMESTAMP WITH TIME ZONE "
+            "USING to_timestamp(timestamp, 'YYYY-MM-DD HH24:MI:SS')"
+        ))
+
+
+def convert_additional_fields_to_jsonb(engine: Engine, metadata: MetaData):
+    """Store log_entries.additional_fields as jsonb, which the GIN index needs.
+
+    jsonb cannot hold NUL characters, so \\u0000 escapes are dropped on the way.
+    The ALTER rewrites the table once, under an exclusive lock.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+    columns = {column['name']: column for column in inspect(engine).get_columns('log_entries')}
+    if isinstance(columns['additional_fields']['type'], JSONB):
+        return
+    with engine.begin() as conn:
+        conn.execute(text(
+            "ALTER TABLE log_entries ALTER COLUMN additional_fields TYPE jsonb "
+            "USING replace(additional_fields::text, '\\u0000', '')::jsonb"
+        ))
+
+
+def create_missing_indexes(engine: Engine, metadata: MetaData):
+    """Create indexes declared on the models that an existing table lacks"""
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def drop_superseded_indexes(engine: Engine, metadata: MetaData):
+    """Drop indexes replaced by wider ones on the models"""
+    with engine.begin() as conn:
+        # (log_file_id, timestamp) became (log_file_id, timestamp, id) for keyset pagination.
+        conn.execute(text("DROP INDEX IF EXISTS ix_log_entries_file_timestamp"))
+
+
+def create_text_search_index(engine: Engine, metadata: MetaData):
+    """Index log messages for /logs/search: a GIN tsvector index on PostgreSQL, FTS5 on SQLite"""
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_log_entries_message_fts ON log_entries USING gin (({search.PG_TSVECTOR_SQL}))"
+            ))
+    elif engine.dialect.name == 'sqlite':
+        created = 'log_entries_fts' not in inspect(engine).get_table_names()
+        with engine.begin() as conn:
+            # External-content table: FTS5 stores only the index and reads messages from log_entries.
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS log_entries_fts "
+                "USING fts5(message, content='log_entries', content_rowid='id')"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS log_entries_fts_insert AFTER INSERT ON log_entries BEGIN "
+                "INSERT INTO log_entries_fts(rowid, message) VALUES (new.id, new.message); END"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS log_entries_fts_delete AFTER DELETE ON log_entries BEGIN "
+                "INSERT INTO log_entries_fts(log_entries_fts, rowid, message) VALUES ('delete', old.id, old.message); END"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS log_entries_fts_update AFTER UPDATE OF message ON log_entries BEGIN "
+                "INSERT INTO log_entries_fts(log_entries_fts, rowid, message) VALUES ('delete', old.id, old.message); "
+                "INSERT INTO log_entries_fts(rowid, message) VALUES (new.id, new.message); END"
+            ))
+            if created:
+                conn.execute(text("INSERT INTO log_entries_fts(log_entries_fts) VALUES ('rebuild')"))
+
+
+def partition_log_entries(engine: Engine, metadata: MetaData):
+    """Partition log_entries by upload (LIST on log_file_id), one partition per upload.
+
+    The existing table, rows and indexes included, becomes the DEFAULT
+    partition. A CHECK constraint limits it to the uploads that exist now, so
+    attaching a partition for a later upload does not have to scan it. The
+    primary key is widened to (id, log_file_id), as partitioned tables
+    require. Rebuilding that key and validating the constraint read the old
+    table once, under an exclusive lock.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT relkind FROM pg_class WHERE oid = 'log_entries'::regclass")).scalar() == 'p':
+            return
+        last_upload = conn.execute(text("SELECT coalesce(max(id), 0) FROM log_file")).scalar()
+        primary_key = conn.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = 'log_entries'::regclass AND contype = 'p'"
+        )).scalar()
+        indexes = conn.execute(text(
+            "SELECT c.relname, pg_get_indexdef(c.oid) FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = 'log_entries'::regclass AND NOT i.indisprimary"
+        )).all()
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('log_entries', 'id')")).scalar()
+
+        conn.execute(text("ALTER TABLE log_entries RENAME TO log_entries_default"))
+        for name, _ in indexes:
+            conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_default"'))
+        if primary_key:
+            conn.execute(text(f'ALTER TABLE log_entries_default DROP CONSTRAINT "{primary_key}"'))
+        conn.execute(text("ALTER TABLE log_entries_default ADD PRIMARY KEY (id, log_file_id)"))
+        conn.execute(text(
+            f"ALTER TABLE log_entries_default ADD CONSTRAINT log_entries_default_uploads CHECK (log_file_id <= {int(last_upload)})"
+        ))
+
+        conn.execute(text("CREATE TABLE log_entries (LIKE log_entries_default INCLUDING DEFAULTS) PARTITION BY LIST (log_file_id)"))
+        if sequence:
+            # Owned by the parent, the id sequence survives partitions being dropped.
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY log_entries.id"))
+        conn.execute(text("ALTER TABLE log_entries ADD PRIMARY KEY (id, log_file_id)"))
+        conn.execute(text("ALTER TABLE log_entries ATTACH PARTITION log_entries_default DEFAULT"))
+        # The definitions name log_entries, now the parent; each adopts the renamed index on the default partition.
+        for _, definition in indexes:
+            conn.execute(text(definition))
+
+
+def backfill_rollups(engine: Engine, metadata: MetaData):
+    """Build log_rollups for entries ingested before it existed.
+
+    Runs once, when the rollup table is empty but log_entries is not. The
+    SQL relies on date_trunc, so SQLite development databases are left to
+    re-upload instead.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT EXISTS (SELECT 1 FROM log_rollups)")).scalar():
+            return
+        if not conn.execute(text("SELECT EXISTS (SELECT 1 FROM log_entries)")).scalar():
+            return
+        conn.execute(text(
+            "INSERT INTO log_rollups (log_file_id, bucket, log_level, source, count) "
+            "SELECT log_file_id, date_trunc('minute', timestamp), coalesce(log_level, ''), coalesce(source, ''), count(*) "
+            "FROM log_entries WHERE timestamp IS NOT NULL GROUP BY 1, 2, 3, 4"
+        ))
+
+
+def drop_retired_tables(engine: Engine, metadata: MetaData):
+    """Drop tables whose data now lives elsewhere"""
+    with engine.begin() as conn:
+        # Per-message error counts were replaced by log_template_counts.
+        conn.execute(text("DROP TABLE IF EXISTS log_error_counts"))
+
+
+def backfill_templates(engine: Engine, metadata: MetaData):
+    """Give uploads ingested before template mining one template per distinct message.
+
+    That reproduces the old exact-message grouping for them; their entries
+    keep a NULL template_id, since rewriting every row is not worth it for
+    data the rollups already summarise.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+    with engine.begin() as conn:
+        upload_ids = conn.execute(text(
+            "SELECT id FROM log_file f "
+            "WHERE NOT EXISTS (SELECT 1 FROM log_templates t WHERE t.log_file_id = f.id) "
+            "AND EXISTS (SELECT 1 FROM log_entries e WHERE e.log_file_id = f.id)"
+        )).scalars().all()
+        for upload_id in upload_ids:
+            conn.execute(text(
+                "INSERT INTO log_templates (log_file_id, template_id, template, count) "
+                "SELECT log_file_id, row_number() OVER (ORDER BY message), message, n FROM ("
+                "  SELECT log_file_id, coalesce(message, '') AS message, count(*) AS n "
+                "  FROM log_entries WHERE log_file_id = :upload_id GROUP BY 1, 2"
+                ") messages"
+            ), {"upload_id": upload_id})
+            conn.execute(text(
+                "INSERT INTO log_template_counts (log_file_id, template_id, log_level, count) "
+                "SELECT e.log_file_id, t.template_id, coalesce(e.log_level, ''), count(*) "
+                "FROM log_entries e JOIN log_templates t "
+                "ON t.log_file_id = e.log_file_id AND t.template = coalesce(e.message, '') "
+                "WHERE e.log_file_id = :upload_id GROUP BY 1, 2, 3"
+            ), {"upload_id": upload_id})
+
+
+def backfill_promoted_fields(engine: Engine, metadata: MetaData):
+    """Fill http_status and client_ip for entries ingested before they were promoted from additional_fields.
+
+    Mirrors parser.promoted_fields. Uploads from before then have a NULL
+    fields_promoted, which add_missing_columns leaves on existing rows; each
+    is backfilled and marked in its own transaction, so the work is done once
+    and resumes where it stopped. SQLite development databases are left to
+    re-upload instead.
+    """
+    if engine.dialect.name != 'postgresql':
+        return
+    keys = parser.HTTP_STATUS_KEYS + parser.CLIENT_IP_KEYS
+    status = ', '.join(f"additional_fields->>'{key}'" for key in parser.HTTP_STATUS_KEYS)
+    client_ip = ', '.join(f"nullif(additional_fields->>'{key}', '')" for key in parser.CLIENT_IP_KEYS)
+    with engine.connect() as conn:
+        upload_ids = conn.execute(text("SELECT id FROM log_file WHERE fields_promoted IS NULL ORDER BY id")).scalars().all()
+    for upload_id in upload_ids:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE log_entries SET "
+                f"http_status = (SELECT value::smallint FROM unnest(ARRAY[{status}]) WITH ORDINALITY AS s(value, n) "
+                "WHERE value ~ '^[1-5][0-9][0-9]$' ORDER BY n LIMIT 1), "
+                f"client_ip = coalesce({client_ip}) "
+                "WHERE log_file_id = :upload_id "
+                "AND additional_fields ?| ARRAY[" + ', '.join(f"'{key}'" for key in keys) + "] "
+                "AND http_status IS NULL AND client_ip IS NULL"
+            ), {"upload_id": upload_id})
+            conn.execute(text("UPDATE log_file SET fields_promoted = true WHERE id = :upload_id"), {"upload_id": upload_id})
+
+
+MIGRATIONS = [
+    add_missing_columns,
+    widen_upload_size,
+    convert_entry_timestamps,
+    convert_additional_fields_to_jsonb,
+    create_missing_indexes,
+    drop_superseded_indexes,
+    create_text_search_index,
+    partition_log_entries,
+    backfill_rollups,
+    drop_retired_tables,
+    backfill_templates,
+    backfill_promoted_fields,
+]
+
+
+def run_migrations(engine: Engine, metadata: MetaData):
+    """Bring an existing database up to date with the models; every step is idempotent"""
+    for migration in MIGRATIONS:
+        migration(engine, metadata)
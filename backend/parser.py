@@ -1,8 +1,18 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import NamedTuple
+import bz2
+import gzip
+import io
+import multiprocessing
+import os
 import re
 import json
 
+from backend import timestamps
+
 class BaseLogParser(ABC):
     @abstractmethod
     def parse(self, line: str) -> dict:
@@ -15,14 +25,22 @@ class BaseLogParser(ABC):
         """Check if this parser can handle the given log line"""
         pass
 
+    @classmethod
+    def format_name(cls) -> str:
+        """Name reported by LogParserFactory.detect_format for this parser"""
+        return cls.__name__.replace('Parser', '').lower()
+
 class PythonLogParser(BaseLogParser):
-    PYTHON_LOG_PATTERN = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - ([A-Z]+) - (.*)$'
+    PYTHON_LOG_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - ([A-Z]+) - (.*)$')
     
     def parse(self, line: str) -> dict:
-        match = re.match(self.PYTHON_LOG_PATTERN, line)
+        match = self.PYTHON_LOG_PATTERN.match(line)
         if match:
             timestamp_str, log_level, message = match.groups()
-            timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S,%f')
+            try:
+                timestamp = timestamps.parse_python(timestamp_str)
+            except ValueError:
+                return None
             return {
                 'timestamp': timestamp,
                 'log_level': log_level,
@@ -34,16 +52,19 @@ class PythonLogParser(BaseLogParser):
     
     @classmethod
     def can_parse(cls, line: str) -> bool:
-        return bool(re.match(cls.PYTHON_LOG_PATTERN, line))
+        return bool(cls.PYTHON_LOG_PATTERN.match(line))
 
 class ApacheLogParser(BaseLogParser):
-    APACHE_LOG_PATTERN = r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}) - - \[(.*?)\] \"(.*?)\" (\d{3}) (\d+) \"(.*?)\" \"(.*?)\"'
+    APACHE_LOG_PATTERN = re.compile(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}) - - \[(.*?)\] \"(.*?)\" (\d{3}) (\d+) \"(.*?)\" \"(.*?)\"')
     
     def parse(self, line: str) -> dict:
-        match = re.match(self.APACHE_LOG_PATTERN, line)
+        match = self.APACHE_LOG_PATTERN.match(line)
         if match:
             ip, timestamp_str, request, status, size, referer, user_agent = match.groups()
-            timestamp = datetime.strptime(timestamp_str, '%d/%b/%Y:%H:%M:%S %z')
+            try:
+                timestamp = timestamps.parse_apache(timestamp_str)
+            except ValueError:
+                return None
             log_level = 'INFO' if int(status) < 400 else 'ERROR'
             return {
                 'timestamp': timestamp,
@@ -62,21 +83,23 @@ class ApacheLogParser(BaseLogParser):
     
     @classmethod
     def can_parse(cls, line: str) -> bool:
-        return bool(re.match(cls.APACHE_LOG_PATTERN, line))
+        return bool(cls.APACHE_LOG_PATTERN.match(line))
 
 class JsonLogParser(BaseLogParser):
     def parse(self, line: str) -> dict:
+        if not self.can_parse(line):
+            return None
         try:
             log_data = json.loads(line)
             return {
-                'timestamp': datetime.fromisoformat(log_data.get('timestamp', '')),
+                'timestamp': timestamps.parse_iso(log_data.get('timestamp', '')),
                 'log_level': log_data.get('level', 'INFO'),
                 'source': log_data.get('source', 'unknown'),
                 'message': log_data.get('message', ''),
                 'additional_fields': {k: v for k, v in log_data.items() 
                                     if k not in ['timestamp', 'level', 'source', 'message']}
             }
-        except (json.JSONDecodeError, ValueError):
+        except (json.JSONDecodeError, TypeError, ValueError):
             return None
     
     @classmethod
@@ -84,6 +107,30 @@ class JsonLogParser(BaseLogParser):
         line = line.strip()
         return line.startswith('{') and line.endswith('}')
 
+# additional_fields keys copied into typed, indexed log_entries columns at ingest, by preference.
+HTTP_STATUS_KEYS = ('status', 'status_code', 'http_status')
+CLIENT_IP_KEYS = ('ip', 'client_ip', 'remote_addr')
+
+def promoted_fields(additional_fields: dict) -> tuple:
+    """The (http_status, client_ip) an entry's additional_fields carry, with None for either that is absent"""
+    if not additional_fields:
+        return None, None
+    http_status = client_ip = None
+    for key in HTTP_STATUS_KEYS:
+        try:
+            value = int(additional_fields[key])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 100 <= value <= 599:
+            http_status = value
+            break
+    for key in CLIENT_IP_KEYS:
+        value = additional_fields.get(key)
+        if isinstance(value, str) and value:
+            client_ip = value
+            break
+    return http_status, client_ip
+
 class LogParserFactory:
     PARSERS = [
         PythonLogParser,
@@ -91,21 +138,41 @@ class LogParserFactory:
         JsonLogParser,
         # Add new parsers here
     ]
+    _instances = {}
+
+    @classmethod
+    def get_instance(cls, parser_cls) -> BaseLogParser:
+        """Shared instance of a parser class; parsers keep no per-line state"""
+        parser = cls._instances.get(parser_cls)
+        if parser is None:
+            parser = cls._instances[parser_cls] = parser_cls()
+        return parser
     
     @classmethod
     def get_parser(cls, line: str) -> BaseLogParser:
         """Get the appropriate parser for the given log line"""
         for parser_cls in cls.PARSERS:
             if parser_cls.can_parse(line):
-                return parser_cls()
+                return cls.get_instance(parser_cls)
+        return None
+
+    @classmethod
+    def get_parser_for_format(cls, log_format: str) -> BaseLogParser:
+        """Get the parser whose name detect_format reports as `log_format`"""
+        for parser_cls in cls.PARSERS:
+            if parser_cls.format_name() == log_format:
+                return cls.get_instance(parser_cls)
         return None
     
     @classmethod
     def parse_line(cls, line: str) -> dict:
         """Parse a single line using the appropriate parser"""
-        parser = cls.get_parser(line)
-        if parser:
-            return parser.parse(line)
+        # parse() returns None for lines it does not match, so each parser
+        # runs its pattern once instead of once in can_parse and again here.
+        for parser_cls in cls.PARSERS:
+            parsed = cls.get_instance(parser_cls).parse(line)
+            if parsed:
+                return parsed
         return None
     
     @classmethod
@@ -114,5 +181,172 @@ class LogParserFactory:
         for line in lines:
             for parser_cls in cls.PARSERS:
                 if parser_cls.can_parse(line):
-                    return parser_cls.__name__.replace('Parser', '').lower()
+                    return parser_cls.format_name()
         return None
+
+class LogFileParser:
+    """Parses the lines of one file, trying its detected format first.
+
+    Lines the detected format does not match fall back to full dispatch over
+    LogParserFactory.PARSERS. Hits and misses are counted per format.
+    """
+    SAMPLE_SIZE = 100
+
+    def __init__(self, log_format: str = None):
+        self.log_format = log_format
+        self.primary = LogParserFactory.get_parser_for_format(log_format) if log_format else None
+        self.fallbacks = [
+            (parser_cls.format_name(), LogParserFactory.get_instance(parser_cls))
+            for parser_cls in LogParserFactory.PARSERS
+            if parser_cls.format_name() != log_format
+        ]
+        self.hits = {}
+        self.misses = {}
+        self.unparsed = 0
+
+    @classmethod
+    def from_sample(cls, lines: list[str]) -> 'LogFileParser':
+        """Lock in the format detected from the first SAMPLE_SIZE non-empty lines"""
+        sample = [line.strip() for line in lines[:cls.SAMPLE_SIZE] if line.strip()]
+        return cls(LogParserFactory.detect_format(sample))
+
+    def parse_line(self, line: str) -> dict:
+        """Parse a single line, trying the detected format before the others"""
+        if self.primary:
+            parsed = self.primary.parse(line)
+            if parsed:
+                self.hits[self.log_format] = self.hits.get(self.log_format, 0) + 1
+                return parsed
+            self.misses[self.log_format] = self.misses.get(self.log_format, 0) + 1
+        for log_format, parser in self.fallbacks:
+            parsed = parser.parse(line)
+            if parsed:
+                self.hits[log_format] = self.hits.get(log_format, 0) + 1
+                return parsed
+            self.misses[log_format] = self.misses.get(log_format, 0) + 1
+        self.unparsed += 1
+        return None
+
+    def merge_counts(self, hits: dict, misses: dict, unparsed: int):
+        """Fold in counts gathered by another LogFileParser for the same file"""
+        for log_format, count in hits.items():
+            self.hits[log_format] = self.hits.get(log_format, 0) + count
+        for log_format, count in misses.items():
+            self.misses[log_format] = self.misses.get(log_format, 0) + count
+        self.unparsed += unparsed
+
+    def format_stats(self) -> dict:
+        """Per-format hit and miss counts"""
+        formats = set(self.hits) | set(self.misses)
+        return {
+            log_format: {'hits': self.hits.get(log_format, 0), 'misses': self.misses.get(log_format, 0)}
+            for log_format in sorted(formats)
+        }
+
+# Leading bytes of the compressed formats open_log_file decompresses on the fly.
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bzip2': b'BZh',
+    'zstd': b'\x28\xb5\x2f\xfd',
+}
+
+def detect_compression(file_path: str) -> str:
+    """'gzip', 'bzip2' or 'zstd' from the file's magic bytes, or None for plain text"""
+    with open(file_path, 'rb') as f:
+        head = f.read(4)
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+def open_log_file(file_path: str):
+    """Open a log file for binary line reading, decompressing gzip, bzip2 or zstd as it streams.
+
+    Returns (raw, stream): read lines from `stream`; `raw.tell()` is how far
+    into the file on disk reading has got, for progress against its size.
+    """
+    compression = detect_compression(file_path)
+    raw = open(file_path, 'rb')
+    if compression == 'gzip':
+        return raw, gzip.GzipFile(fileobj=raw)
+    if compression == 'bzip2':
+        return raw, bz2.BZ2File(raw)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raw.close()
+            raise ValueError("Reading .zst files requires the zstandard package")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        return raw, io.BufferedReader(reader)
+    return raw, raw
+
+class RangeResult(NamedTuple):
+    """Entries parsed from one byte range of a file, with the range's counters"""
+    end: int
+    entries: list
+    lines_read: int
+    lines_rejected: int
+    hits: dict
+    misses: dict
+    unparsed: int
+
+def split_file_ranges(file_path: str, chunk_bytes: int, start: int = 0) -> list[tuple[int, int]]:
+    """Split a file, from the line starting at byte `start`, into (start, end) byte ranges of about chunk_bytes that end on line boundaries"""
+    size = os.path.getsize(file_path)
+    ranges = []
+    with open(file_path, 'rb') as f:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def parse_file_range(file_path: str, start: int, end: int, log_format: str) -> RangeResult:
+    """Parse the lines in [start, end) of a file; runs in a worker process"""
+    file_parser = LogFileParser(log_format)
+    entries = []
+    lines_read = 0
+    lines_rejected = 0
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    raw_lines = data.split(b'\n')
+    if raw_lines and not raw_lines[-1]:
+        raw_lines.pop()
+    for raw_line in raw_lines:
+        lines_read += 1
+        line = raw_line.decode('utf-8', errors='replace').strip()
+        if not line:
+            continue
+        parsed = file_parser.parse_line(line)
+        if parsed:
+            entries.append(parsed)
+        else:
+            lines_rejected += 1
+    return RangeResult(end, entries, lines_read, lines_rejected,
+                       file_parser.hits, file_parser.misses, file_parser.unparsed)
+
+def parse_file_parallel(file_path: str, log_format: str, workers: int, chunk_bytes: int, start: int = 0):
+    """Parse a file across a process pool, yielding a RangeResult per range in file order.
+
+    At most two ranges per worker are in flight, so memory stays bounded by
+    the chunk size rather than the file size.
+    """
+    ranges = iter(split_file_ranges(file_path, chunk_bytes, start))
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque(
+            pool.submit(parse_file_range, file_path, start, end, log_format)
+            for start, end in islice(ranges, workers * 2)
+        )
+        while pending:
+            result = pending.popleft().result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(pool.submit(parse_file_range, file_path, *next_range, log_format))
+            yield result
@@ -0,0 +1,185 @@
+"""Query language for /logs/search `q` and its translation to indexed text search.
+
+Supported syntax:
+    error timeout       both words (AND is implicit)
+    error OR warning    either word
+    -debug, NOT debug   exclude a word
+    "connection reset"  exact phrase
+    conn*               prefix
+    (a OR b) c          grouping
+"""
+from typing import NamedTuple
+import re
+
+# Document vector for PostgreSQL. The 'simple' configuration lowercases without
+# stemming, which suits identifiers and error codes better than a language
+# dictionary. Punctuation is blanked first so paths, IPs and key=value pairs
+# split into the same alphanumeric words as the query side (and as FTS5's
+# unicode61 tokenizer on SQLite). The GIN index is built on this exact
+# expression, so queries must use it verbatim for the planner to match it.
+PG_TSVECTOR_SQL = "to_tsvector('simple', regexp_replace(coalesce(message, ''), '[^[:alnum:]]+', ' ', 'g'))"
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"?|(-)(?=[^\s)])|([^\s()"]+))')
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+
+class Term(NamedTuple):
+    words: tuple
+    prefix: bool = False
+
+
+class Phrase(NamedTuple):
+    words: tuple
+
+
+class And(NamedTuple):
+    children: tuple
+
+
+class Or(NamedTuple):
+    children: tuple
+
+
+class Not(NamedTuple):
+    child: object
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def tokenize(q: str) -> list:
+    """Split a search string into (kind, value) tokens"""
+    tokens = []
+    position = 0
+    while position < len(q):
+        match = TOKEN_PATTERN.match(q, position)
+        if not match or match.end() == position:
+            break
+        position = match.end()
+        open_paren, close_paren, phrase, minus, word = match.groups()
+        if open_paren:
+            tokens.append(('(', None))
+        elif close_paren:
+            tokens.append((')', None))
+        elif phrase is not None:
+            tokens.append(('phrase', phrase))
+        elif minus:
+            tokens.append(('not', None))
+        elif word in ('AND', 'OR', 'NOT'):
+            tokens.append((word.lower(), None))
+        elif word:
+            tokens.append(('word', word))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == 'or':
+            self.take()
+            children.append(self.parse_and())
+        children = [child for child in children if child is not None]
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self):
+        children = []
+        while self.peek() not in (None, ')', 'or'):
+            if self.peek() == 'and':
+                self.take()
+                continue
+            child = self.parse_unary()
+            if child is not None:
+                children.append(child)
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_unary(self):
+        if self.peek() == 'not':
+            self.take()
+            if self.peek() in (None, ')', 'or', 'and'):
+                return None
+            child = self.parse_unary()
+            return Not(child) if child is not None else None
+        kind, value = self.take()
+        if kind == '(':
+            child = self.parse_or()
+            if self.peek() != ')':
+                raise QuerySyntaxError("Unbalanced parenthesis in search query")
+            self.take()
+            return child
+        if kind == 'phrase':
+            words = tuple(WORD_PATTERN.findall(value))
+            return Phrase(words) if words else None
+        if kind == 'word':
+            words = tuple(WORD_PATTERN.findall(value))
+            return Term(words, prefix=value.endswith('*')) if words else None
+        raise QuerySyntaxError(f"Unexpected '{kind}' in search query")
+
+
+def parse_query(q: str):
+    """Parse a search string into a tree of Term/Phrase/And/Or/Not, or None if it has no words"""
+    parser = _Parser(tokenize(q or ''))
+    node = parser.parse_or()
+    if parser.peek() is not None:
+        raise QuerySyntaxError("Unbalanced parenthesis in search query")
+    return node
+
+
+def to_tsquery_text(node) -> str:
+    """Render a parsed query in PostgreSQL to_tsquery syntax"""
+    if isinstance(node, Term):
+        lexemes = ' <-> '.join(f"'{word}'" for word in node.words)
+        return f"{lexemes}:*" if node.prefix else (f"({lexemes})" if len(node.words) > 1 else lexemes)
+    if isinstance(node, Phrase):
+        return '(' + ' <-> '.join(f"'{word}'" for word in node.words) + ')'
+    if isinstance(node, And):
+        return '(' + ' & '.join(to_tsquery_text(child) for child in node.children) + ')'
+    if isinstance(node, Or):
+        return '(' + ' | '.join(to_tsquery_text(child) for child in node.children) + ')'
+    if isinstance(node, Not):
+        return '!' + to_tsquery_text(node.child)
+    raise TypeError(f"Unknown query node {node!r}")
+
+
+def to_fts5_match(node) -> str:
+    """Render a parsed query as an SQLite FTS5 MATCH expression.
+
+    FTS5 only has binary NOT, so negations must sit in an AND next to at
+    least one positive term; a query that is nothing but negations raises
+    QuerySyntaxError and callers handle it with NOT IN instead.
+    """
+    if isinstance(node, Term):
+        phrase = '"' + ' '.join(node.words) + '"'
+        return phrase + '*' if node.prefix else phrase
+    if isinstance(node, Phrase):
+        return '"' + ' '.join(node.words) + '"'
+    if isinstance(node, Or):
+        return '(' + ' OR '.join(to_fts5_match(child) for child in node.children) + ')'
+    if isinstance(node, And):
+        positive = [child for child in node.children if not isinstance(child, Not)]
+        negative = [child.child for child in node.children if isinstance(child, Not)]
+        if not positive:
+            raise QuerySyntaxError("Search query needs at least one term that is not excluded")
+        expression = '(' + ' AND '.join(to_fts5_match(child) for child in positive) + ')'
+        for child in negative:
+            expression = f'({expression} NOT {to_fts5_match(child)})'
+        return expression
+    if isinstance(node, Not):
+        raise QuerySyntaxError("Excluded terms are only supported alongside other terms")
+    raise TypeError(f"Unknown query node {node!r}")
@@ -0,0 +1,109 @@
+"""Incremental log template mining with a Drain-style fixed-depth parse tree.
+
+Messages are split on whitespace and tokens containing digits are masked as
+parameters. The tree routes a message by token count and then by its first
+few tokens to a small list of clusters; the message joins the most similar
+cluster (positions that differ become parameters) or starts a new one.
+
+He et al., "Drain: An Online Log Parsing Approach with Fixed Depth Tree", ICWS 2017.
+"""
+import re
+
+WILDCARD = '<*>'
+DIGIT_PATTERN = re.compile(r'\d')
+
+
+class LogTemplate:
+    __slots__ = ('template_id', 'tokens', 'count')
+
+    def __init__(self, template_id: int, tokens: list):
+        self.template_id = template_id
+        self.tokens = tokens
+        self.count = 0
+
+    @property
+    def text(self) -> str:
+        return ' '.join(self.tokens)
+
+
+class _Node:
+    __slots__ = ('children', 'templates')
+
+    def __init__(self):
+        self.children = {}
+        self.templates = []
+
+
+class TemplateMiner:
+    """Assigns each message of one upload a small integer template id, starting at 1"""
+
+    def __init__(self, depth: int = 4, similarity_threshold: float = 0.4, max_children: int = 100):
+        # depth counts the length level and the leaf, so depth - 2 tokens route a message.
+        self.prefix_tokens = max(depth - 2, 1)
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.root = {}
+        self.templates = {}
+        self.touched = set()
+        self.next_id = 1
+
+    @staticmethod
+    def tokenize(message: str) -> list:
+        return [WILDCARD if DIGIT_PATTERN.search(token) else token for token in (message or '').split()]
+
+    def _leaf(self, tokens: list) -> _Node:
+        node = self.root.get(len(tokens))
+        if node is None:
+            node = self.root[len(tokens)] = _Node()
+        for token in tokens[:self.prefix_tokens]:
+            child = node.children.get(token)
+            if child is None:
+                if token != WILDCARD and len(node.children) >= self.max_children:
+                    token = WILDCARD
+                child = node.children.get(token)
+                if child is None:
+                    child = node.children[token] = _Node()
+            node = child
+        return node
+
+    @staticmethod
+    def _similarity(template_tokens: list, tokens: list) -> float:
+        if not tokens:
+            return 1.0
+        same = sum(1 for expected, token in zip(template_tokens, tokens) if expected == token or expected == WILDCARD)
+        return same / len(tokens)
+
+    def add_message(self, message: str) -> int:
+        """Route a message to its template, creating or generalising one as needed, and return the id"""
+        tokens = self.tokenize(message)
+        leaf = self._leaf(tokens)
+        best, best_similarity = None, -1.0
+        for template in leaf.templates:
+            similarity = self._similarity(template.tokens, tokens)
+            if similarity > best_similarity:
+                best, best_similarity = template, similarity
+        if best is None or best_similarity < self.similarity_threshold:
+            best = LogTemplate(self.next_id, tokens)
+            self.next_id += 1
+            self.templates[best.template_id] = best
+            leaf.templates.append(best)
+        else:
+            best.tokens = [expected if expected == token else WILDCARD for expected, token in zip(best.tokens, tokens)]
+        best.count += 1
+        self.touched.add(best.template_id)
+        return best.template_id
+
+    def restore(self, template_id: int, text: str, count: int = 0):
+        """Re-add a template stored by an earlier miner for the same upload, keeping its id"""
+        tokens = text.split()
+        template = LogTemplate(template_id, tokens)
+        template.count = count
+        self.templates[template_id] = template
+        self._leaf(tokens).templates.append(template)
+        self.next_id = max(self.next_id, template_id + 1)
+
+    def pop_touched(self) -> list:
+        """Templates that matched a message since the last call, with their current text and count"""
+        touched = [self.templates[template_id] for template_id in sorted(self.touched)]
+        self.touched.clear()
+        return touched
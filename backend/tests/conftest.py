@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+import pytest
+
+if not os.getenv("DATABASE_URL", "").startswith("postgresql"):
+    # backend.main binds its engine to DATABASE_URL at import.
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "tests.db")
+
+from fastapi.testclient import TestClient
+
+from backend import main
+
+
+@pytest.fixture(scope="session")
+def user_id() -> int:
+    with main.SessionLocal() as db:
+        user = main.get_user_by_username(db, "tests")
+        if user is None:
+            user = main.create_user(db, main.UserCreate(username="tests", email="tests@example.com", password="tests"))
+        return user.id
+
+
+@pytest.fixture(scope="session")
+def client(user_id):
+    """API client authenticated as the test user; the lifespan's background workers are not started"""
+    with main.SessionLocal() as db:
+        token = main.create_access_token(db.get(main.User, user_id))
+    return TestClient(main.app, headers={"Authorization": f"Bearer {token}"})
@@ -0,0 +1,18 @@
+"""Registration and role changes"""
+import uuid
+
+from backend import main
+
+
+def test_register_ignores_a_requested_role(client):
+    username = f"user-{uuid.uuid4().hex[:8]}"
+    response = client.post("/auth/register", json={"username": username, "email": f"{username}@example.com",
+                                                   "password": "secret", "role": "admin"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "viewer"
+    with main.SessionLocal() as db:
+        assert main.get_user_by_username(db, username).role == "viewer"
+
+
+def test_only_admins_change_roles(client, user_id):
+    assert client.put(f"/users/{user_id}/role", json={"role": "admin"}).status_code == 403
@@ -0,0 +1,87 @@
+"""The two log_entries loaders store exactly the rows they are given.
+
+The executemany path runs on the tests' database; the COPY path needs
+DATABASE_URL to point at PostgreSQL with psycopg2 and is skipped otherwise.
+Their throughput is compared by backend.benchmarks.run --loader-url.
+"""
+from datetime import datetime, timezone
+import os
+
+import pytest
+
+from backend import main, parser
+from backend.benchmarks.generate import LogGenerator
+
+ROWS = int(os.getenv("LOADER_TEST_ROWS", "5000"))
+copy_supported = main.engine.dialect.driver == "psycopg2"
+
+# Values COPY's text format has to escape, and NULLs in every nullable column.
+AWKWARD_ENTRIES = [
+    {"timestamp": datetime(2025, 6, 5, 12, 0, tzinfo=timezone.utc), "log_level": "ERROR", "source": "tab\tsource",
+     "message": "tab\there, newline\nthere, CR\rthere", "additional_fields": {"path": "C:\\logs\\app.log"}},
+    {"timestamp": datetime(2025, 6, 5, 12, 0, 1, tzinfo=timezone.utc), "log_level": "INFO", "source": "Python",
+     "message": "backslash \\ and a literal \\N and \\t", "additional_fields": {"quote": "say \"hi\"\t", "nested": {"list": [1, None, "x\ny"]}}},
+    {"timestamp": None, "log_level": None, "source": None, "message": None, "additional_fields": {}},
+    {"timestamp": datetime(2025, 6, 5, 12, 0, 2, tzinfo=timezone.utc), "log_level": "WARNING", "source": "Apache",
+     "message": "GET /ünïcode ✓ HTTP/1.1", "template_id": 7,
+     "additional_fields": {"status": "503", "ip": "10.0.0.1", "empty": "", "none": None}},
+]
+
+
+@pytest.fixture(scope="module")
+def entries():
+    parsed = [parser.LogParserFactory.parse_line(line) for line in LogGenerator(seed=4).lines(ROWS)]
+    assert all(parsed)
+    return parsed + AWKWARD_ENTRIES
+
+
+@pytest.fixture
+def upload(user_id):
+    with main.SessionLocal() as db:
+        upload_id = main.create_upload(db, user_id, "loader-test.log", 0).id
+        main.create_entry_partition(db, upload_id)
+        db.commit()
+    yield upload_id
+    with main.SessionLocal() as db:
+        main.delete_upload(db, db.get(main.Upload, upload_id))
+
+
+def load(loader, upload_id: int, entries: list):
+    """Load entries in ingest-sized batches, committing each"""
+    with main.SessionLocal() as db:
+        for batch in main.batched(entries, main.INGEST_BATCH_SIZE):
+            loader(db, main.log_entry_rows(upload_id, batch))
+            db.commit()
+
+
+def stored_rows(upload_id: int) -> list:
+    """The upload's rows in insertion order, without ids and with the upload id left out"""
+    columns = [getattr(main.LogEntry, column) for column in main.LOG_ENTRY_COPY_COLUMNS[1:]]
+    with main.SessionLocal() as db:
+        rows = db.query(*columns).filter(main.LogEntry.log_file_id == upload_id).order_by(main.LogEntry.id).all()
+    return [tuple(main.as_utc(value) if isinstance(value, datetime) else value for value in row) for row in rows]
+
+
+def expected_rows(entries: list) -> list:
+    return [row[1:] for row in main.log_entry_rows(0, entries)]
+
+
+def test_executemany_loader(entries, upload):
+    load(main.executemany_log_entries, upload, entries)
+    assert stored_rows(upload) == expected_rows(entries)
+
+
+@pytest.mark.skipif(not copy_supported, reason="COPY needs DATABASE_URL to point at PostgreSQL with psycopg2")
+def test_copy_loader(entries, upload):
+    load(main.copy_log_entries, upload, entries)
+    assert stored_rows(upload) == expected_rows(entries)
+
+
+@pytest.mark.skipif(not copy_supported, reason="COPY needs DATABASE_URL to point at PostgreSQL with psycopg2")
+def test_copy_loader_drops_nul_characters(upload):
+    entry = {"timestamp": None, "log_level": "INFO", "source": "svc", "message": "nul\x00here",
+             "additional_fields": {"key": "nul\x00value", "nested": ["a\x00b"]}}
+    load(main.copy_log_entries, upload, [entry])
+    [row] = stored_rows(upload)
+    assert row[4] == "nulhere"
+    assert row[-1] == {"key": "nulvalue", "nested": ["ab"]}
@@ -0,0 +1,92 @@
+"""ResponseCache invalidation and the generation check that keeps racing computations out"""
+import pytest
+
+from backend import cache
+
+
+@pytest.fixture
+def responses():
+    return cache.ResponseCache(max_entries=3, ttl_seconds=60)
+
+
+def key(upload_id, endpoint="distribution", **params):
+    return cache.ResponseCache.make_key(1, upload_id, endpoint, params)
+
+
+def test_equivalent_params_share_a_key():
+    assert key(5, n=3, level=None) == key(5, level=None, n=3)
+    assert key(5, n=3) != key(5, n="3")
+
+
+def test_put_then_get(responses):
+    stored = responses.put(key(5), b"body")
+    assert responses.get(key(5)) == stored
+    assert stored.etag == cache.body_etag(b"body")
+
+
+def test_invalidate_drops_the_upload_and_every_upload_entries(responses):
+    responses.put(key(5), b"five")
+    responses.put(key(6), b"six")
+    responses.put(key(None), b"all")
+    responses.invalidate_upload(5)
+    assert responses.get(key(5)) is None
+    assert responses.get(key(None)) is None
+    assert responses.get(key(6)) is not None
+
+
+def test_put_computed_before_an_invalidation_is_not_stored(responses):
+    generation = responses.generation(5)
+    responses.invalidate_upload(5)  # ingest committed while the response was being computed
+    entry = responses.put(key(5), b"stale", generation)
+    assert entry.body == b"stale"
+    assert responses.get(key(5)) is None
+
+
+def test_put_survives_other_uploads_invalidations(responses):
+    generation = responses.generation(5)
+    responses.invalidate_upload(6)
+    responses.put(key(5), b"fresh", generation)
+    assert responses.get(key(5)).body == b"fresh"
+
+
+def test_every_upload_entries_race_with_any_invalidation(responses):
+    generation = responses.generation(None)
+    responses.invalidate_upload(6)
+    responses.put(key(None), b"stale", generation)
+    assert responses.get(key(None)) is None
+
+
+def test_put_after_the_invalidation_is_stored(responses):
+    responses.invalidate_upload(5)
+    responses.put(key(5), b"fresh", responses.generation(5))
+    assert responses.get(key(5)).body == b"fresh"
+
+
+def test_least_recently_used_goes_first(responses):
+    for upload_id in (1, 2, 3):
+        responses.put(key(upload_id), b"x")
+    responses.get(key(1))
+    responses.put(key(4), b"x")
+    assert [responses.get(key(upload_id)) is not None for upload_id in (1, 2, 3, 4)] == [True, False, True, True]
+
+
+def test_entries_expire(monkeypatch, responses):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    responses.put(key(5), b"x")
+    now[0] += 59
+    assert responses.get(key(5)) is not None
+    now[0] += 1
+    assert responses.get(key(5)) is None
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ("*", True),
+    ('"other"', False),
+])
+def test_etag_matches(header, matches):
+    assert cache.etag_matches(header, '"abc"') is matches
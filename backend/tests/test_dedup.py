@@ -0,0 +1,98 @@
+"""ChunkScanner: finding the earlier upload whose whole file a new one starts with"""
+import itertools
+
+import pytest
+
+from backend import dedup
+from backend.benchmarks.generate import LogGenerator
+
+
+def log_lines(count: int, seed: int = 1) -> list:
+    return [(line + "\n").encode() for line in LogGenerator(seed=seed).lines(count)]
+
+
+def scan(lines: list, uploads: dict, feed_size: int = 1000):
+    """Scan lines against earlier uploads ({upload_id: chunks}), returning the scanner and its overlap"""
+    first_chunks = {chunks[0].digest: (upload_id, chunks) for upload_id, chunks in uploads.items()}
+    scanner = dedup.ChunkScanner(first_chunks.get)
+    for start in range(0, len(lines), feed_size):
+        scanner.feed(lines[start:start + feed_size])
+    return scanner, scanner.finish()
+
+
+def chunks_of(lines: list) -> list:
+    scanner, _ = scan(lines, {})
+    return scanner.chunks
+
+
+@pytest.fixture(scope="module")
+def lines():
+    return log_lines(6000)
+
+
+@pytest.fixture(scope="module")
+def earlier(lines):
+    """Chunks of an earlier upload of the first 4000 lines, whose last chunk ends at its end of file"""
+    chunks = chunks_of(lines[:4000])
+    assert len(chunks) > 2
+    boundaries = set(itertools.accumulate(chunk.lines for chunk in chunks_of(lines)))
+    assert 4000 not in boundaries
+    return chunks
+
+
+def test_chunks_cover_every_line(lines):
+    chunks = chunks_of(lines)
+    assert sum(chunk.lines for chunk in chunks) == len(lines)
+    assert sum(chunk.bytes for chunk in chunks) == sum(map(len, lines))
+    assert all(chunk.lines <= dedup.MAX_CHUNK_LINES for chunk in chunks)
+
+
+def test_boundaries_do_not_depend_on_how_lines_are_fed(lines):
+    assert scan(lines, {}, feed_size=1)[0].chunks == scan(lines, {}, feed_size=5000)[0].chunks
+
+
+def test_identical_file(lines, earlier):
+    scanner, overlap = scan(lines[:4000], {1: earlier})
+    assert overlap == dedup.Overlap(1, 4000, sum(map(len, lines[:4000])), identical=True)
+    assert scanner.chunks == earlier
+
+
+def test_grown_file_skips_the_earlier_lines(lines, earlier):
+    """The earlier file's last chunk is matched against the start of a longer chunk"""
+    _, overlap = scan(lines, {1: earlier})
+    assert overlap == dedup.Overlap(1, 4000, sum(map(len, lines[:4000])), identical=False)
+
+
+def test_line_endings_do_not_matter(lines, earlier):
+    crlf = [line.replace(b"\n", b"\r\n") for line in lines]
+    _, overlap = scan(crlf, {1: earlier})
+    assert overlap == dedup.Overlap(1, 4000, sum(map(len, crlf[:4000])), identical=False)
+
+
+def test_earlier_file_without_final_newline(lines):
+    unterminated = lines[:3999] + [lines[3999].rstrip(b"\n")]
+    _, overlap = scan(lines, {1: chunks_of(unterminated)})
+    assert overlap is not None and overlap.lines == 4000
+
+
+def test_rotated_file_does_not_overlap(lines, earlier):
+    """After rotation the new file holds the old one's tail, not its whole content"""
+    _, overlap = scan(lines[2500:] + log_lines(500, seed=2), {1: earlier})
+    assert overlap is None
+
+
+def test_new_file_shorter_than_the_earlier_one(lines, earlier):
+    _, overlap = scan(lines[:3000], {1: earlier})
+    assert overlap is None
+
+
+def test_file_that_diverges_inside_the_earlier_content(lines, earlier):
+    changed = list(lines)
+    changed[3000] = b"a line that was not there before\n"
+    _, overlap = scan(changed, {1: earlier})
+    assert overlap is None
+
+
+def test_unrelated_file(earlier):
+    _, overlap = scan(log_lines(3000, seed=3), {1: earlier})
+    assert overlap is None
@@ -0,0 +1,94 @@
+"""Followed files and append streams: the last read on /unfollow, and rotation"""
+import os
+
+import pytest
+
+from backend import main
+
+LINE = "2025-06-05 12:00:0{},000 - INFO - {}"
+
+
+def messages(upload_id: int) -> list:
+    with main.SessionLocal() as db:
+        return [message for (message,) in
+                db.query(main.LogEntry.message).filter(main.LogEntry.log_file_id == upload_id).order_by(main.LogEntry.id)]
+
+
+@pytest.fixture
+def followed(tmp_path, user_id):
+    """An upload following tmp_path/app.log, which starts with one line"""
+    path = tmp_path / "app.log"
+    path.write_text(LINE.format(0, "first") + "\n")
+    with main.SessionLocal() as db:
+        upload = main.Upload(user_id=user_id, filename="app.log", size=0, status="following",
+                             follow_path=str(path), follow_offset=0, follow_inode=os.stat(path).st_ino)
+        db.add(upload)
+        db.flush()
+        main.create_entry_partition(db, upload.id)
+        db.commit()
+        upload_id = upload.id
+    yield path, upload_id
+    with main.SessionLocal() as db:
+        main.delete_upload(db, db.get(main.Upload, upload_id))
+
+
+def ingest(upload_id: int, final: bool = False):
+    """Poll the upload until nothing is waiting, as the follow poller would"""
+    poller = main.FollowPoller(0)
+    while True:
+        with main.SessionLocal() as db:
+            if not poller.ingest_new_lines(db, db.get(main.Upload, upload_id), final):
+                return
+
+
+def test_unfollow_ingests_final_line_without_newline(client):
+    upload_id = client.post("/logs/follow", json={}).json()["upload_id"]
+    with main.SessionLocal() as db:
+        spool = db.get(main.Upload, upload_id).follow_path
+    body = LINE.format(0, "first") + "\n" + LINE.format(1, "no newline")
+    assert client.post(f"/logs/upload/{upload_id}/append", content=body.encode()).status_code == 200
+
+    response = client.post(f"/logs/upload/{upload_id}/unfollow")
+
+    assert response.json() == {"upload_id": upload_id, "status": "completed"}
+    assert messages(upload_id) == ["first", "no newline"]
+    assert not os.path.exists(spool)
+    assert client.post(f"/logs/upload/{upload_id}/unfollow").status_code == 409
+    client.delete(f"/logs/upload/{upload_id}")
+
+
+def test_partial_line_waits_for_its_newline(followed):
+    path, upload_id = followed
+    with open(path, "a") as f:
+        f.write(LINE.format(1, "sec"))
+    ingest(upload_id)
+    assert messages(upload_id) == ["first"]
+    with open(path, "a") as f:
+        f.write("ond\n")
+    ingest(upload_id)
+    assert messages(upload_id) == ["first", "second"]
+
+
+def test_rotation_reads_the_rest_of_the_renamed_file_first(followed):
+    path, upload_id = followed
+    ingest(upload_id)
+    # logrotate's default: rename, then create; the writer finishes its last line in the old file.
+    with open(path, "a") as f:
+        f.write(LINE.format(1, "late") + "\n" + LINE.format(2, "unterminated"))
+    os.rename(path, str(path) + ".1")
+    path.write_text(LINE.format(3, "rotated") + "\n")
+
+    ingest(upload_id)
+
+    assert messages(upload_id) == ["first", "late", "unterminated", "rotated"]
+    with main.SessionLocal() as db:
+        upload = db.get(main.Upload, upload_id)
+        assert (upload.follow_inode, upload.follow_offset) == (os.stat(path).st_ino, os.path.getsize(path))
+
+
+def test_truncation_restarts_from_the_beginning(followed):
+    path, upload_id = followed
+    ingest(upload_id)
+    path.write_text(LINE.format(1, "cut") + "\n")
+    ingest(upload_id)
+    assert messages(upload_id) == ["first", "cut"]
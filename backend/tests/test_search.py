@@ -0,0 +1,146 @@
+"""The /logs/search query language, its index translations, and paging through results"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend import main, search
+from backend.search import And, Not, Or, Phrase, Term
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("error", Term(("error",))),
+    ("error timeout", And((Term(("error",)), Term(("timeout",))))),
+    ("error AND timeout", And((Term(("error",)), Term(("timeout",))))),
+    ("error OR warning", Or((Term(("error",)), Term(("warning",))))),
+    ("-debug error", And((Not(Term(("debug",))), Term(("error",))))),
+    ("NOT debug", Not(Term(("debug",)))),
+    ('"connection reset"', Phrase(("connection", "reset"))),
+    ('"unterminated phrase', Phrase(("unterminated", "phrase"))),
+    ("conn*", Term(("conn",), prefix=True)),
+    ("(a OR b) c", And((Or((Term(("a",)), Term(("b",)))), Term(("c",))))),
+    ("10.0.0.1", Term(("10", "0", "0", "1"))),
+    ("GET /api/v1", And((Term(("GET",)), Term(("api", "v1"))))),
+    ("a OR", Term(("a",))),
+    ("well-known", Term(("well", "known"))),
+])
+def test_parse_query(q, expected):
+    assert search.parse_query(q) == expected
+
+
+@pytest.mark.parametrize("q", ["", "   ", "()", "-", "NOT", "*", '""', " OR"])
+def test_queries_without_words_parse_to_nothing(q):
+    assert search.parse_query(q) is None
+
+
+@pytest.mark.parametrize("q", ["(a", "a)", "(a OR (b)", "a ) b"])
+def test_unbalanced_parentheses(q):
+    with pytest.raises(search.QuerySyntaxError):
+        search.parse_query(q)
+
+
+def test_tsquery_text():
+    node = search.parse_query('(error OR warn*) "disk full" -debug 10.0.0.1')
+    assert search.to_tsquery_text(node) == "(('error' | 'warn':*) & ('disk' <-> 'full') & !'debug' & ('10' <-> '0' <-> '0' <-> '1'))"
+
+
+def test_fts5_match():
+    node = search.parse_query('(error OR warn*) "disk full" -debug')
+    assert search.to_fts5_match(node) == '((("error" OR "warn"*) AND "disk full") NOT "debug")'
+
+
+@pytest.mark.parametrize("q", ["-debug", "-debug -trace"])
+def test_fts5_match_rejects_only_negations(q):
+    with pytest.raises(search.QuerySyntaxError):
+        search.to_fts5_match(search.parse_query(q))
+
+
+MESSAGES = [
+    "request 1 failed for user 7",
+    "request 2 failed: connection reset by peer",
+    "connection reset while reading headers",
+    "debug: cache warm",
+    "payment declined for order 12",
+    "payment accepted for order 13",
+]
+
+
+@pytest.fixture(scope="module")
+def upload_id(user_id):
+    """An upload holding MESSAGES twice over, several entries sharing each timestamp"""
+    start = datetime(2025, 6, 5, 12, 0, tzinfo=timezone.utc)
+    entries = [
+        {"timestamp": start + timedelta(seconds=index // 3), "log_level": "INFO", "source": "app",
+         "message": message, "additional_fields": {}}
+        for index, message in enumerate(MESSAGES * 2)
+    ]
+    with main.SessionLocal() as db:
+        upload_id = main.create_upload(db, user_id, "search.log", 0).id
+        main.create_entry_partition(db, upload_id)
+        main.bulk_insert_log_entries(db, upload_id, entries)
+        db.commit()
+    yield upload_id
+    with main.SessionLocal() as db:
+        main.delete_upload(db, db.get(main.Upload, upload_id))
+
+
+def found(client, upload_id: int, **params) -> list:
+    response = client.get("/logs/search", params={"upload_id": upload_id, "per_page": 50, **params})
+    assert response.status_code == 200, response.text
+    return sorted(log["message"] for log in response.json()["logs"])
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("failed", ["request 1 failed for user 7", "request 2 failed: connection reset by peer"]),
+    ('"connection reset"', ["connection reset while reading headers", "request 2 failed: connection reset by peer"]),
+    ("connection -failed", ["connection reset while reading headers"]),
+    ("-failed -payment", ["connection reset while reading headers", "debug: cache warm"]),
+    ("pay* declined", ["payment declined for order 12"]),
+    ("debug OR accepted", ["debug: cache warm", "payment accepted for order 13"]),
+    ("(declined OR accepted) 13", ["payment accepted for order 13"]),
+])
+def test_search_text(client, upload_id, q, expected):
+    assert found(client, upload_id, q=q) == sorted(expected * 2)
+
+
+def test_search_relevance_ranks_matches(client, upload_id):
+    response = client.get("/logs/search", params={"upload_id": upload_id, "q": "connection reset", "sort": "relevance"})
+    assert response.status_code == 200
+    assert {log["message"] for log in response.json()["logs"]} == {MESSAGES[1], MESSAGES[2]}
+    assert response.json()["total"] == 4
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({"q": "(failed"}, "Unbalanced parenthesis in search query"),
+    ({"q": "failed)"}, "Unbalanced parenthesis in search query"),
+    ({"cursor": "not-a-cursor"}, "Invalid cursor"),
+    ({"q": "failed", "sort": "relevance", "cursor": main.encode_cursor(main.LogEntry(timestamp=datetime(2025, 1, 1), id=1))},
+     "Cursors are not supported with sort=relevance"),
+])
+def test_search_rejects_bad_requests(client, upload_id, params, detail):
+    response = client.get("/logs/search", params={"upload_id": upload_id, **params})
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_cursor_round_trip():
+    entry = main.LogEntry(timestamp=datetime(2025, 6, 5, 12, 0, 1, 500000), id=42)
+    assert main.decode_cursor(main.encode_cursor(entry)) == (datetime(2025, 6, 5, 12, 0, 1, 500000), 42)
+
+
+def test_keyset_pages_cover_every_entry_once(client, upload_id):
+    """Entries share timestamps across page boundaries; the id breaks the ties"""
+    ids, cursor = [], None
+    while True:
+        params = {"upload_id": upload_id, "per_page": 5, "total_mode": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/logs/search", params=params).json()
+        ids += [log["id"] for log in page["logs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(ids) == len(MESSAGES) * 2 == len(set(ids))
+    with main.SessionLocal() as db:
+        expected = [entry_id for (entry_id,) in db.query(main.LogEntry.id).filter(main.LogEntry.log_file_id == upload_id)
+                    .order_by(main.LogEntry.timestamp.desc(), main.LogEntry.id.desc())]
+    assert ids == expected
@@ -0,0 +1,72 @@
+"""TemplateMiner: grouping messages into templates with stable ids"""
+from backend import templates
+from backend.templates import WILDCARD
+
+
+def texts(miner) -> dict:
+    return {template_id: template.text for template_id, template in miner.templates.items()}
+
+
+def test_numbers_are_masked_and_share_a_template():
+    miner = templates.TemplateMiner()
+    ids = [miner.add_message(f"request {n} failed for user u{n}") for n in range(5)]
+    assert ids == [1] * 5
+    assert texts(miner) == {1: f"request {WILDCARD} failed for user {WILDCARD}"}
+    assert miner.templates[1].count == 5
+
+
+def test_differing_words_become_wildcards():
+    miner = templates.TemplateMiner()
+    first = miner.add_message("user alice logged in from office")
+    second = miner.add_message("user alice logged out from office")
+    assert first == second
+    assert texts(miner) == {1: f"user alice logged {WILDCARD} from office"}
+
+
+def test_dissimilar_messages_get_their_own_templates():
+    miner = templates.TemplateMiner()
+    ids = [
+        miner.add_message("connection reset by peer"),
+        miner.add_message("disk almost full on volume"),
+        miner.add_message("cache warm"),
+        miner.add_message("connection reset by peer"),
+    ]
+    assert ids == [1, 2, 3, 1]
+
+
+def test_length_separates_templates():
+    miner = templates.TemplateMiner()
+    assert miner.add_message("job done") != miner.add_message("job done quickly")
+
+
+def test_empty_and_missing_messages():
+    miner = templates.TemplateMiner()
+    assert miner.add_message("") == miner.add_message(None)
+    assert texts(miner) == {1: ""}
+
+
+def test_restored_templates_keep_their_ids():
+    miner = templates.TemplateMiner()
+    miner.add_message("request 1 failed")
+    miner.add_message("cache warm")
+    restored = templates.TemplateMiner()
+    for template_id, template in miner.templates.items():
+        restored.restore(template_id, template.text, template.count)
+    assert restored.add_message("request 2 failed") == 1
+    assert restored.templates[1].count == 2
+    assert restored.add_message("something new entirely") == 3
+
+
+def test_pop_touched_reports_each_template_once():
+    miner = templates.TemplateMiner()
+    for message in ("a 1", "a 2", "b c"):
+        miner.add_message(message)
+    assert [(template.template_id, template.count) for template in miner.pop_touched()] == [(1, 2), (2, 1)]
+    assert miner.pop_touched() == []
+
+
+def test_wide_routing_levels_fall_back_to_a_wildcard_child():
+    miner = templates.TemplateMiner(max_children=2)
+    ids = [miner.add_message(f"{word} started") for word in ("alpha", "beta", "gamma", "delta")]
+    assert ids[:2] == [1, 2]
+    assert ids[2] == ids[3]
@@ -0,0 +1,49 @@
+"""get_time_series buckets in UTC on every database"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from backend import main
+
+UTC = timezone.utc
+# 2025-06-01 is a Sunday; the minutes sit near UTC day, week and month boundaries.
+MINUTES = {
+    datetime(2025, 5, 31, 23, 30, tzinfo=UTC): 1,
+    datetime(2025, 6, 1, 0, 30, tzinfo=UTC): 2,
+    datetime(2025, 6, 2, 1, 0, tzinfo=UTC): 4,
+    datetime(2025, 6, 2, 23, 59, tzinfo=UTC): 8,
+}
+
+
+@pytest.fixture(scope="module")
+def upload_id(user_id):
+    with main.SessionLocal() as db:
+        upload_id = main.create_upload(db, user_id, "time-series.log", 0).id
+        db.add_all(main.LogRollup(log_file_id=upload_id, bucket=bucket, log_level="INFO", source="", count=count)
+                   for bucket, count in MINUTES.items())
+        db.commit()
+    yield upload_id
+    with main.SessionLocal() as db:
+        main.delete_upload(db, db.get(main.Upload, upload_id))
+
+
+def series(upload_id: int, interval: str) -> list:
+    with main.SessionLocal() as db:
+        if db.get_bind().dialect.name == "postgresql":
+            # A session zone far from UTC would move day, week and month boundaries if they followed it.
+            db.execute(text("SET TIME ZONE 'Pacific/Auckland'"))
+        [data] = main.get_time_series(db, datetime(2025, 5, 1, tzinfo=UTC), datetime(2025, 7, 1, tzinfo=UTC),
+                                      interval, upload_id=upload_id)
+    return [(point.x, point.y) for point in data.data]
+
+
+@pytest.mark.parametrize("interval, expected", [
+    ("hour", [("2025-05-31T23:00:00+00:00", 1), ("2025-06-01T00:00:00+00:00", 2),
+              ("2025-06-02T01:00:00+00:00", 4), ("2025-06-02T23:00:00+00:00", 8)]),
+    ("day", [("2025-05-31T00:00:00+00:00", 1), ("2025-06-01T00:00:00+00:00", 2), ("2025-06-02T00:00:00+00:00", 12)]),
+    ("week", [("2025-05-26T00:00:00+00:00", 3), ("2025-06-02T00:00:00+00:00", 12)]),
+    ("month", [("2025-05-01T00:00:00+00:00", 1), ("2025-06-01T00:00:00+00:00", 14)]),
+])
+def test_buckets_are_utc(upload_id, interval, expected):
+    assert series(upload_id, interval) == expected
@@ -0,0 +1,54 @@
+"""Timestamp decoders: every result is an aware UTC datetime"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend import timestamps
+
+UTC = timezone.utc
+
+
+def test_parse_python():
+    assert timestamps.parse_python("2025-06-05 12:04:57,123") == datetime(2025, 6, 5, 12, 4, 57, 123000, tzinfo=UTC)
+
+
+@pytest.mark.parametrize("text", ["2025-06-05 12:04:57", "2025-06-05 12:04:57.123", "2025-13-05 12:04:57,123", "yesterday"])
+def test_parse_python_rejects(text):
+    with pytest.raises(ValueError):
+        timestamps.parse_python(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("05/Jun/2025:12:04:57 +0000", datetime(2025, 6, 5, 12, 4, 57, tzinfo=UTC)),
+    ("05/Jun/2025:12:04:57 +0200", datetime(2025, 6, 5, 10, 4, 57, tzinfo=UTC)),
+    ("31/Dec/2025:23:30:00 -0130", datetime(2026, 1, 1, 1, 0, tzinfo=UTC)),
+])
+def test_parse_apache(text, expected):
+    parsed = timestamps.parse_apache(text)
+    assert parsed == expected
+    assert parsed.utcoffset() == timedelta(0)
+
+
+@pytest.mark.parametrize("text", ["05/Jux/2025:12:04:57 +0000", "05/Jun/2025 12:04:57 +0000", "05/Jun/2025:12:04:57", "32/Jun/2025:12:04:57 +0000"])
+def test_parse_apache_rejects(text):
+    with pytest.raises(ValueError):
+        timestamps.parse_apache(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-06-05T12:04:57", datetime(2025, 6, 5, 12, 4, 57, tzinfo=UTC)),
+    ("2025-06-05T12:04:57Z", datetime(2025, 6, 5, 12, 4, 57, tzinfo=UTC)),
+    ("2025-06-05T14:04:57.5+02:00", datetime(2025, 6, 5, 12, 4, 57, 500000, tzinfo=UTC)),
+    ("2025-06-05", datetime(2025, 6, 5, tzinfo=UTC)),
+])
+def test_parse_iso(text, expected):
+    parsed = timestamps.parse_iso(text)
+    assert parsed == expected
+    assert parsed.tzinfo is UTC
+
+
+def test_to_utc():
+    naive = datetime(2025, 6, 5, 12)
+    assert timestamps.to_utc(naive) == datetime(2025, 6, 5, 12, tzinfo=UTC)
+    shifted = datetime(2025, 6, 5, 12, tzinfo=timezone(timedelta(hours=-5)))
+    assert timestamps.to_utc(shifted) == datetime(2025, 6, 5, 17, tzinfo=UTC)
@@ -0,0 +1,51 @@
+"""Timestamp decoding shared by the log parsers.
+
+Every decoder returns an aware datetime in UTC; timestamps without an offset
+are taken to already be UTC, as the database layer assumes. Invalid input
+raises ValueError, like strptime.
+
+Everything is decoded by the C implementation of datetime.fromisoformat,
+which also takes the logging module's comma before milliseconds and is
+several times faster than strptime. Apache's layout is first rearranged into
+ISO form at fixed offsets; it carries no fraction, so each distinct second is
+decoded only once. Attaching UTC through the string ('Z') rather than
+datetime.replace keeps the naive layouts on the C path too.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+
+MONTHS = {name: f'{number:02d}' for number, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1)}
+# Distinct seconds remembered; busy logs repeat the same few for thousands of lines.
+SECOND_CACHE_SIZE = 4096
+
+
+def to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    if value.tzinfo is timezone.utc:
+        return value
+    return value.astimezone(timezone.utc)
+
+
+def parse_python(text: str) -> datetime:
+    """Decode the logging module's default 'YYYY-MM-DD HH:MM:SS,mmm'"""
+    if len(text) != 23 or text[19] != ',':
+        raise ValueError(f"Invalid timestamp {text!r}")
+    return datetime.fromisoformat(text + 'Z')
+
+
+@lru_cache(maxsize=SECOND_CACHE_SIZE)
+def parse_apache(text: str) -> datetime:
+    """Decode Apache's 'DD/Mon/YYYY:HH:MM:SS +zzzz'"""
+    if len(text) != 26 or text[2] != '/' or text[6] != '/' or text[11] != ':' or text[20] != ' ' or text[21] not in '+-':
+        raise ValueError(f"Invalid timestamp {text!r}")
+    month = MONTHS.get(text[3:6])
+    if month is None:
+        raise ValueError(f"Invalid month in timestamp {text!r}")
+    return to_utc(datetime.fromisoformat(f'{text[7:11]}-{month}-{text[0:2]}T{text[12:20]}{text[21:24]}:{text[24:26]}'))
+
+
+def parse_iso(text: str) -> datetime:
+    """Decode ISO 8601 as datetime.fromisoformat accepts it"""
+    return to_utc(datetime.fromisoformat(text))
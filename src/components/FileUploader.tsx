@@ -37,12 +37,12 @@ const FileUploader = ({ onFileUpload, isProcessing, setIsProcessing }: FileUploa
   };
 
   const handleFileSelection = async (file: File) => {
-    // Validate file type
+    // Validate file type; rotated (app.log.1) and .gz/.zst/.bz2 compressed logs are accepted too
     const validTypes = ['.log', '.txt', '.json'];
-    const fileExtension = '.' + file.name.split('.').pop()?.toLowerCase();
+    const baseName = file.name.toLowerCase().replace(/\.(gz|zst|bz2)$/, '').replace(/\.\d+$/, '');
     
-    if (!validTypes.includes(fileExtension)) {
-      alert('Please upload a .log, .txt, or .json file');
+    if (!validTypes.some(type => baseName.endsWith(type))) {
+      alert('Please upload a .log, .txt, or .json file (optionally .gz, .zst or .bz2 compressed)');
       return;
     }
 
@@ -102,7 +102,7 @@ const FileUploader = ({ onFileUpload, isProcessing, setIsProcessing }: FileUploa
       <input
         ref={fileInputRef}
         type="file"
-        accept=".log,.txt,.json"
+        accept=".log,.txt,.json,.gz,.zst,.bz2"
         onChange={handleFileInputChange}
         className="hidden"
       />
@@ -13,7 +13,7 @@ interface LogTableProps {
 }
 
 const LogTable = ({ filters }: LogTableProps) => {
-  const { logEntries } = useLogContext();
+  const { logEntries, liveMode, setLiveMode } = useLogContext();
   const [sortField, setSortField] = useState<keyof LogEntry>('timestamp');
   const [sortDirection, setSortDirection] = useState<'asc' | 'desc'>('desc');
   const [currentPage, setCurrentPage] = useState(1);
@@ -103,9 +103,17 @@ const LogTable = ({ filters }: LogTableProps) => {
     <div className="p-6">
       <div className="flex items-center justify-between mb-6">
         <h3 className="text-lg font-semibold">Log Entries</h3>
-        <div className="text-sm text-slate-400">
-          Showing {paginatedEntries.length} of {sortedEntries.length} entries 
-          {filteredEntries.length !== logEntries.length && ` (${logEntries.length} total)`}
+        <div className="flex items-center gap-4">
+          <div className="text-sm text-slate-400">
+            Showing {paginatedEntries.length} of {sortedEntries.length} entries 
+            {filteredEntries.length !== logEntries.length && ` (${logEntries.length} total)`}
+          </div>
+          <button
+            className={`px-3 py-1 rounded text-sm transition-colors ${liveMode ? 'bg-green-600 hover:bg-green-700' : 'bg-slate-700 hover:bg-slate-600'}`}
+            onClick={() => setLiveMode(!liveMode)}
+          >
+            {liveMode ? 'Live' : 'Go live'}
+          </button>
         </div>
       </div>
 
@@ -1,11 +1,21 @@
 
 import { useState } from "react";
 import { Download, FileText, FileSpreadsheet } from "lucide-react";
+import { apiService } from "../services/api";
+import { useLogContext } from "../contexts/LogContext";
 
 const ReportDownloadButton = () => {
   const [isMenuOpen, setIsMenuOpen] = useState(false);
+  const { currentUploadId } = useLogContext();
 
   const handleDownload = (format: 'pdf' | 'csv') => {
+    if (format === 'csv' && currentUploadId !== null) {
+      // The server streams the whole upload, so nothing is buffered in the browser.
+      window.location.href = apiService.exportLogsUrl({ format: 'csv', upload_id: currentUploadId, order: 'asc' });
+      setIsMenuOpen(false);
+      return;
+    }
+
     // Mock download functionality
     console.log(`Downloading report in ${format} format`);
     setIsMenuOpen(false);
@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useState, ReactNode } from 'react';
+import React, { createContext, useContext, useEffect, useState, ReactNode } from 'react';
 import { apiService, ApiLogEntry, ApiSearchResponse } from '../services/api';
 
 export interface LogEntry {
@@ -45,6 +45,8 @@ interface LogContextType {
   refreshAnalysis: () => Promise<void>;
   clearLogData: () => void;
   loading: boolean;
+  liveMode: boolean;
+  setLiveMode: (live: boolean) => void;
 }
 
 const LogContext = createContext<LogContextType | undefined>(undefined);
@@ -75,12 +77,38 @@ const convertApiLogEntry = (apiEntry: ApiLogEntry): LogEntry => ({
   responseTime: apiEntry.additional_fields?.responseTime,
 });
 
+const MAX_LIVE_ENTRIES = 5000;
+
 export const LogProvider = ({ children }: LogProviderProps) => {
   const [logEntries, setLogEntries] = useState<LogEntry[]>([]);
   const [logAnalysis, setLogAnalysis] = useState<LogAnalysis | null>(null);
   const [uploadedFileName, setUploadedFileName] = useState<string | null>(null);
   const [currentUploadId, setCurrentUploadId] = useState<number | null>(null);
   const [loading, setLoading] = useState(false);
+  const [liveMode, setLiveMode] = useState(false);
+
+  // Live mode: entries ingested for the current upload are pushed over Server-Sent Events.
+  useEffect(() => {
+    if (!liveMode || currentUploadId === null) {
+      return;
+    }
+    const source = new EventSource(apiService.liveStreamUrl(currentUploadId));
+    source.addEventListener('entries', (event) => {
+      const entries: ApiLogEntry[] = JSON.parse((event as MessageEvent).data);
+      setLogEntries(previous => [...entries.map(convertApiLogEntry).reverse(), ...previous].slice(0, MAX_LIVE_ENTRIES));
+    });
+    source.addEventListener('lagged', () => {
+      searchLogs({ per_page: 100, upload_id: currentUploadId });
+    });
+    source.addEventListener('status', (event) => {
+      const { status } = JSON.parse((event as MessageEvent).data);
+      if (!['queued', 'processing', 'following'].includes(status)) {
+        source.close();
+        setLiveMode(false);
+      }
+    });
+    return () => source.close();
+  }, [liveMode, currentUploadId]);
 
   const searchLogs = async (params: any) => {
     try {
@@ -112,7 +140,7 @@ export const LogProvider = ({ children }: LogProviderProps) => {
             await refreshAnalysis();
             await searchLogs({ per_page: 100, upload_id: response.upload_id });
             return { status: 'completed' };
-          } else if (status.status === 'processing') {
+          } else if (status.status === 'queued' || status.status === 'processing') {
             await new Promise(resolve => setTimeout(resolve, 2000));
             return pollStatus();
           } else if (status.status === 'failed') {
@@ -222,7 +250,9 @@ export const LogProvider = ({ children }: LogProviderProps) => {
       uploadLog,
       refreshAnalysis,
       clearLogData,
-      loading
+      loading,
+      liveMode,
+      setLiveMode
     }}>
       {children}
     </LogContext.Provider>
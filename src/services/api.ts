@@ -7,13 +7,36 @@ export interface ApiLogEntry {
   source: string;
   message: string;
   additional_fields: Record<string, any>;
+  template_id: number | null;
+  http_status: number | null;
+  client_ip: string | null;
+}
+
+// Structured filters shared by search, export and distribution. `fields` entries are 'key:value'.
+export interface FieldFilters {
+  http_status?: number;
+  status_class?: '1xx' | '2xx' | '3xx' | '4xx' | '5xx';
+  client_ip?: string;
+  fields?: string[];
+}
+
+function appendParams(queryParams: URLSearchParams, params: Record<string, unknown>) {
+  Object.entries(params).forEach(([key, value]) => {
+    if (Array.isArray(value)) {
+      value.forEach((item) => queryParams.append(key, String(item)));
+    } else if (value !== undefined && value !== null && value !== '') {
+      queryParams.append(key, String(value));
+    }
+  });
 }
 
 export interface ApiSearchResponse {
   logs: ApiLogEntry[];
-  total: number;
+  total: number | null;
   page: number;
   per_page: number;
+  next_cursor: string | null;
+  total_mode: 'exact' | 'estimate' | 'none';
 }
 
 export interface ApiAnalyticsResponse {
@@ -27,10 +50,25 @@ export interface ApiAnalyticsResponse {
 export interface ApiUploadResponse {
   upload_id: number;
   status: string;
+  linked_upload_id?: number;
 }
 
 export interface ApiUploadStatus {
   status: string;
+  progress: number;
+  bytes_read: number;
+  lines_read: number;
+  lines_parsed: number;
+  lines_rejected: number;
+  lines_inserted: number;
+  log_format: string | null;
+  format_stats: Record<string, { hits: number; misses: number }>;
+  queue_position: number | null;
+  attempts: number;
+  lines_per_second: number | null;
+  lines_deduplicated: number;
+  linked_upload_id: number | null;
+  overlap_upload_id: number | null;
 }
 
 export interface Upload {
@@ -38,6 +76,7 @@ export interface Upload {
   filename: string;
   timestamp: string;
   status?: string;
+  storage?: 'database' | 'archive' | null;
 }
 
 class ApiService {
@@ -69,7 +108,7 @@ class ApiService {
     return headers;
   }
 
-  async login(username: string, password: string): Promise<{ access_token: string; token_type: string }> {
+  async login(username: string, password: string): Promise<{ access_token: string; token_type: string; expires_in: number }> {
     const formData = new FormData();
     formData.append('username', username);
     formData.append('password', password);
@@ -89,6 +128,24 @@ class ApiService {
     return data;
   }
 
+  async changePassword(currentPassword: string, newPassword: string): Promise<{ access_token: string; token_type: string; expires_in: number }> {
+    const response = await fetch(`${API_BASE_URL}/auth/password`, {
+      method: 'POST',
+      headers: this.getHeaders(),
+      body: JSON.stringify({ current_password: currentPassword, new_password: newPassword }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Password change failed');
+    }
+
+    // Earlier tokens are revoked by the change, so keep the one issued with it.
+    const data = await response.json();
+    this.token = data.access_token;
+    localStorage.setItem('auth_token', data.access_token);
+    return data;
+  }
+
   async register(username: string, email: string, password: string): Promise<any> {
     const response = await fetch(`${API_BASE_URL}/auth/register`, {
       method: 'POST',
@@ -113,6 +170,9 @@ class ApiService {
       body: formData,
     });
 
+    if (response.status === 429) {
+      throw new Error('The ingestion queue is full, please try again shortly');
+    }
     if (!response.ok) {
       throw new Error('Upload failed');
     }
@@ -121,6 +181,99 @@ class ApiService {
     return data;
   }
 
+  async followLog(path?: string, filename?: string, fromEnd = false): Promise<ApiUploadResponse> {
+    const response = await fetch(`${API_BASE_URL}/logs/follow`, {
+      method: 'POST',
+      headers: this.getHeaders(),
+      body: JSON.stringify({ path, filename, from_end: fromEnd }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to follow log');
+    }
+
+    return await response.json();
+  }
+
+  async stopFollowing(uploadId: number): Promise<ApiUploadResponse> {
+    const response = await fetch(`${API_BASE_URL}/logs/upload/${uploadId}/unfollow`, {
+      method: 'POST',
+      headers: this.getHeaders(),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to stop following log');
+    }
+
+    return await response.json();
+  }
+
+  // Queues the move to Parquet; the upload's status is 'archiving' until it is done.
+  async archiveUpload(uploadId: number): Promise<Upload> {
+    const response = await fetch(`${API_BASE_URL}/logs/upload/${uploadId}/archive`, {
+      method: 'POST',
+      headers: this.getHeaders(),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to archive upload');
+    }
+
+    return await response.json();
+  }
+
+  async deleteUpload(uploadId: number): Promise<void> {
+    const response = await fetch(`${API_BASE_URL}/logs/upload/${uploadId}`, {
+      method: 'DELETE',
+      headers: this.getHeaders(),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to delete upload');
+    }
+  }
+
+  // Uploads older than this many days are deleted automatically; null keeps them.
+  async setRetention(retentionDays: number | null): Promise<any> {
+    const response = await fetch(`${API_BASE_URL}/users/me/retention`, {
+      method: 'PUT',
+      headers: this.getHeaders(),
+      body: JSON.stringify({ retention_days: retentionDays }),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to update retention');
+    }
+
+    return await response.json();
+  }
+
+  // Exports stream straight to disk through a plain browser download, which cannot
+  // send an Authorization header either, so the token goes in the URL.
+  exportLogsUrl(params: {
+    format?: 'ndjson' | 'csv';
+    gzip?: boolean;
+    q?: string;
+    log_level?: string;
+    start_time?: string;
+    end_time?: string;
+    source?: string;
+    upload_id?: number;
+    order?: 'asc' | 'desc';
+  } & FieldFilters): string {
+    const queryParams = new URLSearchParams();
+
+    appendParams(queryParams, params);
+    queryParams.append('token', this.token ?? '');
+
+    return `${API_BASE_URL}/logs/export?${queryParams}`;
+  }
+
+  // EventSource cannot send an Authorization header, so the token goes in the URL.
+  liveStreamUrl(uploadId: number): string {
+    return `${API_BASE_URL}/logs/upload/${uploadId}/stream?token=${encodeURIComponent(this.token ?? '')}`;
+  }
+
   async getUploadStatus(uploadId: number): Promise<ApiUploadStatus> {
     const response = await fetch(`${API_BASE_URL}/logs/upload/${uploadId}/status`, {
       headers: this.getHeaders(),
@@ -142,14 +295,13 @@ class ApiService {
     upload_id?: number;
     page?: number;
     per_page?: number;
-  }): Promise<ApiSearchResponse> {
+    sort?: 'time' | 'relevance';
+    cursor?: string;
+    total_mode?: 'exact' | 'estimate' | 'none';
+  } & FieldFilters): Promise<ApiSearchResponse> {
     const queryParams = new URLSearchParams();
     
-    Object.entries(params).forEach(([key, value]) => {
-      if (value !== undefined && value !== null && value !== '') {
-        queryParams.append(key, value.toString());
-      }
-    });
+    appendParams(queryParams, params);
 
     const response = await fetch(`${API_BASE_URL}/logs/search?${queryParams}`, {
       headers: this.getHeaders(),
@@ -185,8 +337,13 @@ class ApiService {
     return response.json();
   }
 
-  async getDistribution(field: string = 'log_level'): Promise<ApiAnalyticsResponse> {
-    const response = await fetch(`${API_BASE_URL}/analytics/distribution?field=${field}`, {
+  async getDistribution(
+    field: 'log_level' | 'source' | 'http_status' | 'status_class' | 'client_ip' = 'log_level',
+    options: { upload_id?: number; n?: number } & FieldFilters = {}
+  ): Promise<ApiAnalyticsResponse> {
+    const queryParams = new URLSearchParams({ field });
+    appendParams(queryParams, options);
+    const response = await fetch(`${API_BASE_URL}/analytics/distribution?${queryParams}`, {
       headers: this.getHeaders(),
     });
 
@@ -209,6 +366,22 @@ class ApiService {
     return response.json();
   }
 
+  async getTopTemplates(n: number = 10, level?: string, uploadId?: number): Promise<ApiAnalyticsResponse> {
+    const params = new URLSearchParams({ n: n.toString() });
+    if (level) params.append('level', level);
+    if (uploadId !== undefined) params.append('upload_id', uploadId.toString());
+
+    const response = await fetch(`${API_BASE_URL}/analytics/top-templates?${params}`, {
+      headers: this.getHeaders(),
+    });
+
+    if (!response.ok) {
+      throw new Error('Failed to get top templates');
+    }
+
+    return response.json();
+  }
+
   async getUploadHistory(): Promise<Upload[]> {
     try {
       const response = await fetch(`${API_BASE_URL}/logs/upload/history`, {